@@ -1,10 +1,14 @@
 import os
+import asyncio
 import asyncpg
+import numpy as np
 import pandas as pd
 from fastapi import HTTPException, Request
+from fastapi.concurrency import run_in_threadpool
 from asyncpg import Connection
 from loguru import logger
 from datetime import datetime
+from functools import partial
 from typing import AsyncIterable, List, Union, AsyncGenerator
 from pydantic import BaseModel, Field
 
@@ -22,6 +26,15 @@ DATA_MAPPING = {
     "numeric": float,
 }
 
+GENERATOR_ENT_TYPES = {  # generator strategies -> entity type of the surrogates
+    "name_generator": "PER",
+    "location_generator": "LOC",
+    "organization_generator": "ORG",
+    "email_generator": "EMAIL",
+    "phone_generator": "PHONE",
+    "url_generator": "URL",
+}
+
 
 class AnonymizationParameters(BaseModel):
     entries_limit: Union[int, None] = Field(default=None, description="The number of entries to anonymize.")
@@ -47,6 +60,27 @@ async def write_to_csv(anonymized_data, csv_file):
     anonymized_data.to_csv(csv_file, mode="a", header=False, index=False)
 
 
+async def generate_per_unique(pd_generator, values: pd.Series, ent_type: str) -> np.ndarray:
+    """
+    Surrogates of a column, generated once per distinct value (one `generate_many` call, one round trip
+    to the model server, made in a thread so the event loop keeps serving requests) and broadcast back
+    to the rows by the codes of `pd.factorize`.
+    The generator is asked for `str(value)` as before, so the consistent surrogates are the same.
+    """
+    codes, uniques = pd.factorize(values)  # in the order of the first row, missing values get the code -1
+    keys = [str(value) for value in uniques]
+    missing = codes == -1
+    if missing.any():  # None, NaN and NaT are one missing value for factorize but different strings
+        missing_codes, missing_keys = pd.factorize(values[missing].map(str))
+        codes = codes.copy()
+        codes[missing] = missing_codes + len(keys)
+        keys += list(missing_keys)
+    surrogates = np.empty(len(keys), dtype=object)
+    if keys:
+        surrogates[:] = await run_in_threadpool(pd_generator.generate_many, keys, ent_type)
+    return surrogates.take(codes)
+
+
 async def process_and_anonymize_chunk(chunk, columns, request, config, include_columns=None,
                                       strategy_by_column=None):
     # if column type is not in the list, it will be skipped
@@ -108,18 +142,23 @@ async def process_and_anonymize_chunk(chunk, columns, request, config, include_c
             anonymization_type = MAPPING_STRATEGY_BY_COLUMN.get(anonymization_type_cat, anonymization_type)
 
         logger.info(f"\033[096mAnonymization type: {anonymization_type}\033[0m")
+        vectorized = False
 
         if anonymization_type == "model":
             batch = [DatabaseDataPayload(data=str(text)) for text in chunk[column_name].tolist()]
-            predictions = request.app.state.model.predict_batch(
-                batch=batch,
-                use_rules=config.aggressive,
-                placeholder=config.placeholder,
-                ents_to_hide=config.entities_to_hide,
-                fuzzy_match=config.fuzzy_match,
-                per_list_label=config.per_list_label,
-                remove_html=config.remove_html
-            )
+            options = dict(use_rules=config.aggressive,
+                           placeholder=config.placeholder,
+                           ents_to_hide=config.entities_to_hide,
+                           fuzzy_match=config.fuzzy_match,
+                           per_list_label=config.per_list_label,
+                           remove_html=config.remove_html,
+                           sentence_level=config.sentence_level,
+                           rules_enabled=config.rules_enabled,
+                           rules_disabled=config.rules_disabled)
+            if request.app.state.process_pool is not None:
+                predictions = await request.app.state.process_pool.predict_batch(batch, **options)
+            else:
+                predictions = await _run_inference(request, request.app.state.model.predict_batch, batch, **options)
             if len(predictions["text"]) != len(chunk):
                 logger.error(
                     f"Failed to anonymize chunk, predictions: {len(predictions['text'])} | chunk: {len(chunk)}")
@@ -129,59 +168,45 @@ async def process_and_anonymize_chunk(chunk, columns, request, config, include_c
                 logger.info(f"\033[092mChunk anonymized successfully ✅\033[0m")
                 chunk[column_name] = predictions["text"]
 
-        elif anonymization_type == "date_generator":
-            # left nans as is
-            # chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'DATE')
-            #                       for d in range(len(chunk)) ]
-            chunk[column_name] = [request.app.state.model.pd_generator.generate("today", 'DATE')
-                                  if pd.isna(d) or d is pd.NaT
-                                  else request.app.state.model.pd_generator.generate(str(d), 'DATE')
-                                  for d in chunk[column_name]]
-        elif anonymization_type == "number_generator":
-            chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'SENSITIVE')
-                                  if d is not pd.isna(d)
-                                  else request.app.state.model.pd_generator.generate("nan", 'SENSITIVE')
-                                  for d in chunk[column_name]]
-
-        elif anonymization_type == "name_generator":
-            chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'PER')
-                                  for d in chunk[column_name]]
-
-        elif anonymization_type == "location_generator":
-            chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'LOC')
-                                  for d in chunk[column_name]]
-
-        elif anonymization_type == "organization_generator":
-            chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'ORG')
-                                  for d in chunk[column_name]]
-
-        elif anonymization_type == "email_generator":
-            chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'EMAIL')
-                                  for d in chunk[column_name]]
-
-        elif anonymization_type == "phone_generator":
-            chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'PHONE')
-                                  for d in chunk[column_name]]
-
-        elif anonymization_type == "url_generator":
-            chunk[column_name] = [request.app.state.model.pd_generator.generate(str(d), 'URL')
-                                  for d in chunk[column_name]]
-
-        # if strategy by column was used - convert data to required type (e.g. int, float, str)
-        if strategy_by_column and column_name in strategy_by_column:
+        elif anonymization_type == "date_generator" and data_type == "date":
+            chunk[column_name] = request.app.state.model.pd_generator.generate_dates(chunk[column_name])
+            vectorized = True
+
+        elif anonymization_type == "number_generator" and DATA_MAPPING.get(data_type) in (int, float):
+            numbers = request.app.state.model.pd_generator.generate_numbers(chunk[column_name])
+            chunk[column_name] = numbers if DATA_MAPPING[data_type] is int else numbers.astype("Float64")
+            vectorized = True
+
+        elif anonymization_type in ("date_generator", "number_generator"):  # text and other column types
+            ent_type = "DATE" if anonymization_type == "date_generator" else "SENSITIVE"
+            chunk[column_name] = await generate_per_unique(request.app.state.model.pd_generator, chunk[column_name],
+                                                           ent_type)
+
+        elif anonymization_type in GENERATOR_ENT_TYPES:
+            chunk[column_name] = await generate_per_unique(request.app.state.model.pd_generator, chunk[column_name],
+                                                           GENERATOR_ENT_TYPES[anonymization_type])
+
+        # if strategy by column was used - convert data to required type (e.g. int, float, str),
+        # the vectorized generators already return the type of the column (with the missing values)
+        if strategy_by_column and column_name in strategy_by_column and not vectorized:
             pd_type = DATA_MAPPING.get(data_type, str)
             chunk[column_name] = chunk[column_name].astype(pd_type)
 
-            if data_type == 'date':
-                chunk[column_name] = pd.to_datetime(chunk[column_name], format='%d.%m.%Y')
-
     logger.info(f"\033[096mColumns in chunk after anonymization: {chunk.columns}\033[0m")
     return chunk
 
 
+async def _run_inference(request, predict_fn, *args, **kwargs):
+    """Run a blocking model call on the inference executor, so the event loop keeps serving requests."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(request.app.state.executor, partial(predict_fn, *args, **kwargs))
+
+
 async def anonymize_concatenated_text(text, request, config):
     payload = DatabaseDataPayload(data=text)
-    predictions = request.app.state.model.predict(
+    predictions = await _run_inference(
+        request,
+        request.app.state.model.predict,
         payload,
         use_rules=config.aggressive,
         placeholder=config.placeholder,
@@ -237,6 +262,7 @@ class PostgresqlConnector:
                 else pd.Timestamp(default_date)
             vals = [
                 tuple(
+                    None if value is pd.NA else  # missing values of the nullable columns (generators) stay NULL
                     default_int if (pd.isna(value) and isinstance(value, (int, float))) else
                     default_timestamp if (pd.isna(value) and isinstance(value, pd.Timestamp)) else
                     default_timestamp if (value is pd.NaT) else
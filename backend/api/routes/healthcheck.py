@@ -1,9 +1,13 @@
 import os
-from fastapi import APIRouter
+from fastapi import APIRouter, Response
+from fastapi.concurrency import run_in_threadpool
 from starlette.requests import Request
 
 from backend.models.healthcheck import HealthcheckResult
-from backend.api.routes.metadata.endpoints import HEALTHCHECK_DESCRIPTION, MODEL_STATUS_DESCRIPTION
+from backend.services.model_server import RemoteModel
+from backend.utils.postprocessing.rules import RULES
+from backend.api.routes.metadata.endpoints import (HEALTHCHECK_DESCRIPTION, MODEL_STATUS_DESCRIPTION,
+                                                  MODEL_STATS_DESCRIPTION)
 
 router = APIRouter()
 CONNECT_TO_DB = os.getenv("CONNECT_TO_DB", False)
@@ -11,9 +15,13 @@ CONNECT_TO_DB = os.getenv("CONNECT_TO_DB", False)
 
 @router.get("/health", response_model=HealthcheckResult, name="heartbeat",
             description=HEALTHCHECK_DESCRIPTION)
-async def get_hearbeat() -> HealthcheckResult:
-    is_healthy = HealthcheckResult(is_alive=True)
-    return is_healthy
+async def get_hearbeat(request: Request, response: Response) -> HealthcheckResult:
+    # with the shared model server the API is only alive while the server answers
+    model = getattr(request.app.state, "model", None)
+    is_alive = await run_in_threadpool(model.ping) if isinstance(model, RemoteModel) else True
+    if not is_alive:
+        response.status_code = 503
+    return HealthcheckResult(is_alive=is_alive)
 
 
 # Model status endpoint
@@ -24,6 +32,21 @@ async def get_model_status(request: Request) -> str:
     return f"Model was loaded: {model_name}."
 
 
+# Inference stats endpoint
+@router.get("/model_stats", name="get_model_stats",
+            description=MODEL_STATS_DESCRIPTION)
+async def get_model_stats(request: Request) -> dict:
+    model = request.app.state.model
+    stats = {"batcher": request.app.state.batcher.stats()}
+    if isinstance(model, RemoteModel):
+        stats["model_server"] = await run_in_threadpool(model.stats)
+    elif hasattr(model, "result_cache"):
+        stats["result_cache"] = model.result_cache.stats()
+        stats["sentence_cache"] = model.sentence_cache.stats()
+        stats["rules"] = RULES.stats()
+    return stats
+
+
 @router.get("/db_status", name="get_db_status",
             description="Check if the database is available.",
             include_in_schema=CONNECT_TO_DB)
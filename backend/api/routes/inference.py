@@ -10,13 +10,16 @@ from loguru import logger
 
 from backend.core.security import validate_request
 from backend.models.inference import ConfigNER, BatchInput, NameList
-from backend.services.ml_model import SpacyModel
+from backend.core.messages import QUEUE_FULL
+from backend.services.batcher import MicroBatcher, QueueFullError
+from backend.utils.postprocessing.rules import RULES
 from backend.api.routes.metadata.endpoints import ANONIMIZATION_DESCRIPTION
 
 router = APIRouter()
 
 BATCH_LEN_LIMIT = 10
 USER_REQUEST_LIMIT = 1000
+RETRY_AFTER_SECONDS = int(os.getenv("RETRY_AFTER_SECONDS", 1))
 logs_dir = os.path.join(os.getenv("ROOT", "./backend"), "../logs")
 REQUESTS_FILE_PATH = os.path.join(logs_dir, "user_requests.log")
 
@@ -36,15 +39,23 @@ async def anonymize(
     is_admin = request.state.user_id == "admin"
     logger.info(f"\033[1;32;40mRequest user id: {request.state.user_id}\033[0m")
 
-    model: SpacyModel = request.app.state.model
+    batcher: MicroBatcher = request.app.state.batcher
     use_rules = config.aggressive
     placeholder = config.placeholder
     ents_to_hide = config.entities_to_hide
     fuzzy_match = config.fuzzy_match
     per_list_label = config.per_list_label
     remove_html = config.remove_html
+    sentence_level = config.sentence_level
+    rules_enabled = config.rules_enabled
+    rules_disabled = config.rules_disabled
     names = None
 
+    unknown_rules = _validate_rule_families((rules_enabled or []) + (rules_disabled or []))
+    if unknown_rules:
+        raise HTTPException(status_code=400,
+                            detail=f"Unknown rule families: {unknown_rules}. Available: {RULES.names}")
+
     if not is_admin:
         # Validate batch length
         if not _validate_batch_len(len(batch_input.texts)):
@@ -65,16 +76,18 @@ async def anonymize(
     logger.debug(f"\033[093mReceived names: {names}\033[090m | Names list: {names_list}\033[0m")
 
     try:
-        predictions = [model.predict(payload=text,
-                                     use_rules=use_rules,
-                                     use_base_model=False,
-                                     placeholder=placeholder,
-                                     ents_to_hide=ents_to_hide,
-                                     checklist=names,
-                                     fuzzy_match=fuzzy_match,
-                                     per_list_label=per_list_label,
-                                     remove_html=remove_html,)
-                       for text in batch_input.texts]
+        predictions = await batcher.submit(batch_input.texts,
+                                           use_rules=use_rules,
+                                           use_base_model=False,
+                                           placeholder=placeholder,
+                                           ents_to_hide=ents_to_hide,
+                                           checklist=names,
+                                           fuzzy_match=fuzzy_match,
+                                           per_list_label=per_list_label,
+                                           remove_html=remove_html,
+                                           sentence_level=sentence_level,
+                                           rules_enabled=rules_enabled,
+                                           rules_disabled=rules_disabled,)
 
         logger.info(f"\033[090mReceived batch of texts: {batch_input.texts}\033[0m")
         logger.info(f"\033[096mPredictions: {[p['personal_data'] for p in predictions]}\033[0m")
@@ -86,6 +99,10 @@ async def anonymize(
 
         return JSONResponse(content={"predictions": predictions}, status_code=200)
 
+    except QueueFullError as e:
+        logger.warning(f"Rejecting batch: {e}")
+        raise HTTPException(status_code=429, detail=QUEUE_FULL,
+                            headers={"Retry-After": str(RETRY_AFTER_SECONDS)})
     except Exception as e:
         logger.error(f"Failed to process batch: {e}")
         raise HTTPException(status_code=500, detail=str(e))
@@ -101,6 +118,11 @@ def _validate_entities_list(entities_list: List[str]):
     return validated_entities
 
 
+def _validate_rule_families(families: List[str]):
+    # Names of the rule families not in the rule engine
+    return [family for family in families if family not in RULES.names]
+
+
 def _validate_batch_len(batch_len: int):
     if batch_len >= BATCH_LEN_LIMIT:
         return False
@@ -16,7 +16,8 @@ config: configuration for the NER model
 **Response**
 predictions: a list of predictions for each text in the batch 
     list of dicts: `{text: str, entities: list}`, 
-    where entities is a list of dicts: `{start: int, end: int, label: str}`
+    where entities is a list of dicts: `{start: int, end: int, label: str, hidden_start: int, hidden_end: int}`
+    (`hidden_start` / `hidden_end` - the position of the entity or its replacement in the anonymized text)
 """
 
 TABLE_ANALYSIS_DESCRIPTION = """
@@ -63,4 +64,10 @@ HEALTHCHECK_DESCRIPTION = """
 
 MODEL_STATUS_DESCRIPTION = """
 # ✅ Model status endpoint, returns the current status of the model, including its name and loading status.
-"""
\ No newline at end of file
+"""
+
+MODEL_STATS_DESCRIPTION = """
+# ✅ Inference stats endpoint, returns micro-batching stats (queue depth, batch sizes, queue wait percentiles)
+result cache stats (hit rate, size) and the time spent in every rule family - for the worker and,
+in shared serving mode, for the model server.
+"""
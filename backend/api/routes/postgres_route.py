@@ -12,7 +12,6 @@ from fastapi.responses import JSONResponse, FileResponse, StreamingResponse
 from fastapi.concurrency import run_in_threadpool
 from starlette.requests import Request
 from loguru import logger
-from concurrent.futures import ThreadPoolExecutor
 from typing import List
 
 from backend.core.db import connect_to_db_via_pool
@@ -25,7 +24,8 @@ from backend.api.adapters.postgres_adapters.connector import (
 )
 
 router = APIRouter()
-executor = ThreadPoolExecutor()
+ANONYMIZATION_CHUNK_SIZE = int(os.getenv("ANONYMIZATION_CHUNK_SIZE", 100))
+SENTENCE_LEVEL_JOBS = os.getenv("SENTENCE_LEVEL_JOBS", "False").lower() in ("true", "1")
 
 
 @router.get("/connect_to_db", name="connect_to_db",
@@ -230,11 +230,12 @@ async def anonymize_data_task(params: AnonymizationParameters, request: Request
     config = ConfigNER()
     config.aggressive = True
     config.remove_html = True
+    config.sentence_level = SENTENCE_LEVEL_JOBS
 
     # Connect to the database and start the anonymization process
     async with request.app.state.pool.acquire() as connection:
         connector = PostgresqlConnector(connection)
-        data_stream = connector.stream_data(params.src_table_name, chunk_size=100, limit=limit)
+        data_stream = connector.stream_data(params.src_table_name, chunk_size=ANONYMIZATION_CHUNK_SIZE, limit=limit)
 
         if params.dest_type == 'db':
             await connector.anonymize_data_to_db(params, request, job_id, data_stream, config)
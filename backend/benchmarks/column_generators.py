@@ -0,0 +1,74 @@
+# python -m backend.benchmarks.column_generators [--rows 1000000] [--distinct 5000]
+"""
+Generator strategies of `process_and_anonymize_chunk`:
+
+- on a categorical column: one surrogate per distinct value broadcast to the rows (`generate_per_unique`)
+  vs a `generate` call for every row, with the equality of the keyed surrogates;
+- on numeric and date columns: the vectorized `generate_numbers` / `generate_dates` vs a `generate` call
+  for every row (and the parsing of the date strings back), with the number of kept missing values.
+"""
+import time
+import random
+import asyncio
+import argparse
+
+import numpy as np
+import pandas as pd
+from loguru import logger
+
+from backend.api.adapters.postgres_adapters.connector import GENERATOR_ENT_TYPES, generate_per_unique
+from backend.services.pd_generator import PersonalDataGenerator
+
+
+def _per_row(pd_generator, values, ent_type):
+    # the generator strategies before the factorization
+    return [pd_generator.generate(str(d), ent_type) for d in values]
+
+
+def _per_row_dates(pd_generator, values):
+    # the date generator before the vectorization: missing dates got a surrogate too
+    return pd.to_datetime([pd_generator.generate(str(d), 'DATE') for d in values], format='%d.%m.%Y')
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=1000000)
+    parser.add_argument("--distinct", type=int, default=5000)
+    args = parser.parse_args()
+
+    logger.remove()
+    distinct = [f"value {i}" for i in range(args.distinct)] + [None, np.nan]
+    column = pd.Series(random.choices(distinct, k=args.rows), dtype=object)
+    for strategy, ent_type in GENERATOR_ENT_TYPES.items():
+        per_row, row_time = _timed(_per_row, PersonalDataGenerator(consistency=True, secret="benchmark"),
+                                   column, ent_type)
+        per_unique, unique_time = _timed(asyncio.run, generate_per_unique(
+            PersonalDataGenerator(consistency=True, secret="benchmark"), column, ent_type))
+        print(f"{strategy:>22}: per row {row_time * 1000:7.0f} ms, per unique {unique_time * 1000:5.0f} ms "
+              f"(x{row_time / unique_time:.0f}) | same surrogates: {per_row == per_unique.tolist()}")
+
+    pd_generator = PersonalDataGenerator(consistency=True, secret="benchmark")
+    numbers = pd.Series(np.random.randint(-10 ** 9, 10 ** 9, args.rows), dtype=np.float64)
+    dates = pd.Series(pd.to_datetime("1950-01-01") + pd.to_timedelta(np.random.randint(0, 30000, args.rows), "D"))
+    numbers[::10], dates[::10] = np.nan, pd.NaT
+    columns = {
+        "number_generator": (numbers, lambda values: _per_row(pd_generator, values, 'SENSITIVE'),
+                             pd_generator.generate_numbers),
+        "date_generator": (dates, lambda values: _per_row_dates(pd_generator, values), pd_generator.generate_dates),
+    }
+    for strategy, (column, per_row, vectorized) in columns.items():
+        _, row_time = _timed(per_row, column)
+        surrogates, vectorized_time = _timed(vectorized, column)
+        print(f"{strategy:>22}: per row {row_time * 1000:7.0f} ms, vectorized {vectorized_time * 1000:5.0f} ms "
+              f"(x{row_time / vectorized_time:.0f}) | missing kept: "
+              f"{pd.isna(surrogates).sum()} of {column.isna().sum()}")
+
+
+if __name__ == "__main__":
+    main()
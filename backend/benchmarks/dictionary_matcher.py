@@ -0,0 +1,53 @@
+# python -m backend.benchmarks.dictionary_matcher [--texts 200]
+"""
+Aho-Corasick `NamesMatcher` vs the previous regex alternation on the dictionaries used by the rules:
+build time, scan time and equality of the matches.
+"""
+import time
+import argparse
+
+from backend.services.pipeline import SAMPLE_TEXTS
+from backend.utils.postprocessing import aho_corasick
+from backend.utils.postprocessing.load_lists import prepare_names_list
+from backend.utils.postprocessing.loc.rules_loc import LOC_LIST
+from backend.utils.postprocessing.match_dict import compile_names_matcher, compile_names_regex
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def _scan(matcher, texts, spans):
+    return [spans(matcher, text) for text in texts]
+
+
+def compare(name: str, names: list, texts: list) -> None:
+    regex, regex_build = _timed(compile_names_regex, names)
+    matcher, matcher_build = _timed(compile_names_matcher, names)
+    regex_spans, regex_scan = _timed(_scan, regex, texts, lambda m, t: [match.span() for match in m.finditer(t)])
+    matcher_spans, matcher_scan = _timed(_scan, matcher, texts, lambda m, t: list(m.finditer(t)))
+
+    chars = sum(len(text) for text in texts)
+    print(f"{name}: {len(set(names))} entries, {len(texts)} texts, {chars} chars")
+    print(f"    regex: build {regex_build * 1000:8.1f} ms, scan {regex_scan * 1000:8.1f} ms")
+    print(f"  matcher: build {matcher_build * 1000:8.1f} ms, scan {matcher_scan * 1000:8.1f} ms "
+          f"(x{regex_scan / matcher_scan:.1f})")
+    print(f"  same matches: {regex_spans == matcher_spans}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--texts", type=int, default=200)
+    args = parser.parse_args()
+
+    names = prepare_names_list()
+    texts = [" ".join(SAMPLE_TEXTS[i % len(SAMPLE_TEXTS):] + names[i * 7:i * 7 + 3]) for i in range(args.texts)]
+    print(f"automaton: {'pyahocorasick' if aho_corasick.ahocorasick is not None else 'pure Python'}")
+    compare("LOC_LIST", LOC_LIST, texts)
+    compare("names (backend/pd)", names, texts)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+# python -m backend.benchmarks.hide_entities [--entities 1000 5000 10000]
+"""
+Hiding the entities of long documents: the single-pass rewriter of `hide_data` vs the previous rebuild
+of the whole text for every entity, with the equality of the hidden texts.
+"""
+import time
+import argparse
+
+from backend.benchmarks.rule_corpus import build_corpus
+from backend.services.cache import Entity
+from backend.utils.postprocessing.hide_data import hide_ents_with_offsets
+from backend.utils.postprocessing.rules import RULES
+from backend.utils.postprocessing.spans import select_spans
+
+
+def _legacy_hide_ents(text, entities, placeholder=None):
+    # `hide_ents` before the rewriter: the text is rebuilt for every entity
+    for ent in reversed(entities):
+        replacement = placeholder if placeholder is not None else f"[{ent.label_}]"
+        text = text[:ent.start_char] + replacement + text[ent.end_char:]
+    return text
+
+
+def _document(entities: int):
+    corpus = build_corpus(size=300)
+    text, found = "", []
+    while len(found) < entities:
+        for case in corpus:
+            offset = len(text)
+            found += [Entity(offset + start, offset + end, label, case[start:end])
+                      for start, end, label in select_spans(RULES.find(case, labels=["CONTACTS", "DATE"]))[0]]
+            text += case + "\n"
+            if len(found) >= entities:
+                break
+    return text, found[:entities]
+
+
+def _timed(fn, *args):
+    started = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entities", type=int, nargs="+", default=[1000, 5000, 10000])
+    args = parser.parse_args()
+
+    for entities in args.entities:
+        text, found = _document(entities)
+        legacy, legacy_time = _timed(_legacy_hide_ents, text, found)
+        (hidden, _), rewriter_time = _timed(hide_ents_with_offsets, text, found)
+        print(f"{len(found)} entities, {len(text) // 1024} KB: rebuild {legacy_time * 1000:8.1f} ms, "
+              f"rewriter {rewriter_time * 1000:6.1f} ms (x{legacy_time / rewriter_time:.0f}) | "
+              f"same text: {legacy == hidden}")
+
+
+if __name__ == "__main__":
+    main()
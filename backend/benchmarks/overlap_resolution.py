@@ -0,0 +1,69 @@
+# python -m backend.benchmarks.overlap_resolution [--kb 100] [--docs 3]
+"""
+Overlap resolution of the rule entities in `add_ents._add_entities` on long documents (aggressive mode):
+the sweep over the sorted token spans vs the previous pairwise check of every candidate against all
+added entities, with the entities kept by both.
+"""
+import time
+import argparse
+
+import spacy
+from loguru import logger
+
+from backend.benchmarks.rule_corpus import build_corpus
+from backend.utils.postprocessing.add_ents import _add_entities, find_checklist_names
+from backend.utils.postprocessing.rules import RULES
+
+
+def _legacy_add_entities(entities, doc, alignment_mode="expand"):
+    # `_add_entities` before the sweep: every candidate is checked against all existing and added entities
+    existing_entities = list(doc.ents)
+    new_entities = []
+
+    def is_overlapping(span, spans):
+        return any(span.start < e.end and span.end > e.start for e in spans)
+
+    for start, end, label in sorted(entities, key=lambda x: x[0]):
+        span = doc.char_span(start, end, label=label, alignment_mode=alignment_mode)
+        if span is None or is_overlapping(span, existing_entities) or is_overlapping(span, new_entities):
+            continue
+        new_entities.append(span)
+    doc.ents = sorted(set(existing_entities + new_entities), key=lambda x: x.start_char)
+    return doc
+
+
+def _timed(fn, entities, nlp, text):
+    doc = nlp.make_doc(text)
+    started = time.perf_counter()
+    doc = fn(entities, doc)
+    return [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents], time.perf_counter() - started
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--kb", type=int, default=100, help="size of a document, KB of text")
+    parser.add_argument("--docs", type=int, default=3)
+    args = parser.parse_args()
+
+    logger.remove()
+    nlp = spacy.blank("ru")
+    corpus = build_corpus(size=2000)
+    checklist = ["Иванов", "Петрова", "Смирнов"]
+    for k in range(args.docs):
+        text = ""
+        for i in range(k, len(corpus), args.docs):
+            if len(text.encode()) >= args.kb * 1024:
+                break
+            text += corpus[i] + "\n"
+
+        entities = find_checklist_names(text, checklist) + RULES.find(text)
+        legacy, legacy_time = _timed(_legacy_add_entities, entities, nlp, text)
+        sweep, sweep_time = _timed(_add_entities, entities, nlp, text)
+        print(f"doc {k}: {len(text.encode()) // 1024} KB, {len(entities)} candidates, {len(sweep)} kept | "
+              f"pairwise {legacy_time * 1000:8.1f} ms, sweep {sweep_time * 1000:6.1f} ms "
+              f"(x{legacy_time / sweep_time:.0f}) | same entities: {legacy == sweep}"
+              + ("" if legacy == sweep else f" ({len(set(legacy) ^ set(sweep))} differ)"))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+# python -m backend.benchmarks.pd_generator [--values 20000]
+"""
+Surrogate generator throughput: the pools of `PersonalDataGenerator` drawn by index (random, keyed)
+vs the previous call into mimesis for every value, per entity type.
+"""
+import time
+import random
+import argparse
+
+from loguru import logger
+from mimesis import Datetime, Generic, Person
+from mimesis.enums import Gender
+from mimesis.locales import Locale
+
+from backend.services.pd_generator import PersonalDataGenerator, load_pools
+
+ENTITY_TYPES = ['PER', 'DATE', 'CONTACTS', 'ORG', 'LOC', 'SENSITIVE', 'PHONE']
+
+
+class LegacyGenerator:
+    """`PersonalDataGenerator._generate` before the pools: one mimesis call per value."""
+
+    def __init__(self):
+        self.person = Person(Locale.RU)
+        self.datetime = Datetime(Locale.RU)
+        self.generic = Generic(Locale.RU)
+
+    def generate(self, s: str, ent_type: str):
+        if ent_type == 'PER':
+            return self.person.name(gender=random.choice([Gender.MALE, Gender.FEMALE]))
+        elif ent_type == 'DATE':
+            return self.datetime.formatted_date()
+        elif ent_type == 'CONTACTS':
+            return self.person.email()
+        elif ent_type == 'ORG':
+            return self.generic.finance.company()
+        elif ent_type == 'LOC':
+            return self.generic.address.city()
+        elif ent_type == 'SENSITIVE':
+            s = s.strip()
+            return self.generic.numeric.integer_number(start=10 ** (len(s) - 1), end=9 * 10 ** (len(s) - 1))
+        elif ent_type == 'PHONE':
+            return self.generic.person.phone_number(mask='+7(9##)#######')
+
+
+def _rate(generator, values, ent_type) -> float:
+    started = time.perf_counter()
+    for value in values:
+        generator.generate(value, ent_type)
+    return len(values) / (time.perf_counter() - started)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--values", type=int, default=20000)
+    args = parser.parse_args()
+
+    logger.remove()
+    started = time.perf_counter()
+    load_pools()
+    print(f"pools loaded in {(time.perf_counter() - started) * 1000:.0f} ms")
+
+    values = [str(random.randrange(10 ** 9, 10 ** 10)) for _ in range(args.values)]
+    generators = {"mimesis": LegacyGenerator(), "pools": PersonalDataGenerator(),
+                  "keyed pools": PersonalDataGenerator(consistency=True, secret="benchmark")}
+    print(f"{'values/s':>10}" + "".join(f"{name:>14}" for name in generators))
+    for ent_type in ENTITY_TYPES:
+        print(f"{ent_type:>10}" + "".join(f"{_rate(generator, values, ent_type):14,.0f}"
+                                          for generator in generators.values()))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+# python -m backend.benchmarks.pipeline_components [--texts 2000] [--exclude tok2vec,parser,...]
+"""
+Load time, memory and throughput of the full spaCy pipeline vs the pipeline without the
+components NER does not need. Every configuration is measured in a fresh process.
+"""
+import time
+import argparse
+import resource
+import multiprocessing
+
+from backend.services.ml_model import MODELS_PATH, BEST_MODEL
+from backend.services.pipeline import SAMPLE_TEXTS, SPACY_EXCLUDE, SPACY_DISABLE, pipeline_mismatches
+
+
+def _max_rss_mb() -> float:
+    return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024  # kilobytes on linux
+
+
+def _measure(path: str, exclude: list, disable: list, n_texts: int, queue) -> None:
+    import spacy
+
+    rss_before = _max_rss_mb()
+    started = time.perf_counter()
+    nlp = spacy.load(path, exclude=exclude, disable=disable)
+    load_s = time.perf_counter() - started
+    rss_loaded = _max_rss_mb()
+
+    texts = (SAMPLE_TEXTS * (n_texts // len(SAMPLE_TEXTS) + 1))[:n_texts]
+    started = time.perf_counter()
+    for _ in nlp.pipe(texts):
+        pass
+    pipe_s = time.perf_counter() - started
+
+    queue.put({
+        "components": list(nlp.pipe_names),
+        "load_s": load_s,
+        "model_mb": rss_loaded - rss_before,
+        "peak_mb": _max_rss_mb(),
+        "texts_per_s": n_texts / pipe_s,
+    })
+
+
+def run(path: str, exclude: list, disable: list, n_texts: int) -> dict:
+    context = multiprocessing.get_context("spawn")
+    queue = context.Queue()
+    process = context.Process(target=_measure, args=(path, exclude, disable, n_texts, queue))
+    process.start()
+    result = queue.get()
+    process.join()
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--model", default=MODELS_PATH + BEST_MODEL)
+    parser.add_argument("--texts", type=int, default=2000)
+    parser.add_argument("--exclude", default=",".join(SPACY_EXCLUDE))
+    parser.add_argument("--disable", default=",".join(SPACY_DISABLE))
+    args = parser.parse_args()
+    exclude = [name for name in args.exclude.split(",") if name]
+    disable = [name for name in args.disable.split(",") if name]
+
+    full = run(args.model, [], [], args.texts)
+    reduced = run(args.model, exclude, disable, args.texts)
+    for name, result in (("full", full), ("reduced", reduced)):
+        print(f"{name:>8}: {result['components']}\n"
+              f"          load {result['load_s']:.2f} s, model {result['model_mb']:.0f} MB, "
+              f"peak RSS {result['peak_mb']:.0f} MB, {result['texts_per_s']:.0f} texts/s")
+    print(f"   saved: load {full['load_s'] - reduced['load_s']:.2f} s, "
+          f"memory {full['peak_mb'] - reduced['peak_mb']:.0f} MB, "
+          f"speedup x{reduced['texts_per_s'] / full['texts_per_s']:.2f}")
+
+    import spacy
+    mismatches = pipeline_mismatches(spacy.load(args.model, exclude=exclude, disable=disable),
+                                     spacy.load(args.model))
+    print(f"entities differ in {len(mismatches)} of {len(SAMPLE_TEXTS)} sample texts")
+
+
+if __name__ == "__main__":
+    main()
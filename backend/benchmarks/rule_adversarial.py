@@ -0,0 +1,82 @@
+# python -m backend.benchmarks.rule_adversarial [--size 10000] [--factor 4]
+"""
+Worst-case inputs for the rule patterns (long tokens, runs of digits and capitals, long lines...):
+every rule family and context pattern is timed on an input of `size` and `size * factor` characters,
+the time must grow linearly (at most twice the factor, to allow for noise).
+"""
+import re
+import time
+import argparse
+
+from loguru import logger
+
+from backend.utils.postprocessing.rules import RULES
+from backend.utils.postprocessing.per.patterns import specific
+
+INPUTS = {
+    "latin letters": "a",
+    "digits": "1",
+    "digits + cyrillic": "1234567890123456789012345678901234567890б",
+    "digit words": "1234a",
+    "email local part": "a.b_c-",
+    "email without domain": "a1234567a",
+    "at signs": "a@",
+    "cyrillic letters": "ж",
+    "capitalized words": "Иван ",
+    "upper case words": "ИВАНОВ ",
+    "latin capitals": "A",
+    "latin names": "John SMITH-",
+    "regions": "краснодарского ",
+    "phones": "123 45 67 ",
+    "dots": "1.1.",
+    "parentheses": "( ",
+    "roles without newline": "доктор Иванов ",
+    "role keywords": "доктор ",
+    "keywords inside a word": "олог",
+    "keywords without a name": "с сыном и мамой ",
+    "spaces": " ",
+}
+
+CONTEXT_PATTERNS = {name: re.compile(getattr(specific, name)) for name in dir(specific) if name.startswith("PATTERN_")}
+
+
+def _best(fn, text: str, repeat: int = 3) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(text)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--size", type=int, default=10000)
+    parser.add_argument("--factor", type=int, default=4)
+    args = parser.parse_args()
+
+    logger.remove()
+    scanners = {family.name: family.find for family in RULES.families}
+    scanners.update({name: (lambda text, p=pattern: list(p.finditer(text))) for name, pattern in CONTEXT_PATTERNS.items()})
+
+    superlinear = []
+    for input_name, unit in INPUTS.items():
+        # whole units only: a text cut inside a unit can end differently (a match on one size, not the other)
+        small = unit * max(args.size // len(unit), 1)
+        large = small * args.factor
+        slowest = (0.0, "", 0.0)
+        for name, scan in scanners.items():
+            small_time, large_time = _best(scan, small), _best(scan, large)
+            growth = large_time / max(small_time, 1e-5)
+            if large_time > 1e-3 and growth > 2 * args.factor:
+                superlinear.append(f"{name} on {input_name!r}: x{growth:.1f}")
+            slowest = max(slowest, (large_time, name, growth))
+        print(f"{input_name:>24}: slowest {slowest[1]:<22} {slowest[0] * 1000:8.2f} ms (x{slowest[2]:.1f})")
+
+    print(f"superlinear: {superlinear or 'none'}")
+    if superlinear:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
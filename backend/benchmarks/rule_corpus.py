@@ -0,0 +1,93 @@
+"""
+Deterministic corpus of clinical-like texts for the rule regression checks and benchmarks:
+names in different formats, phones, emails, dates, document numbers, addresses and organizations.
+"""
+import random
+from typing import List
+
+from mimesis import Address, Datetime, Person
+from mimesis.locales import Locale
+
+from backend.services.pipeline import SAMPLE_TEXTS
+
+TEMPLATES = [
+    "Пациент {name}, {year} г.р., поступил {date}. Тел.: {phone}.",
+    "Пациентка {surname} {initials} консультирована {date} в {city}, e-mail {email}",
+    "Со слов {relative_role}, {name}, ребенок болен в течение {n} дней.",
+    "Адрес: {region}, г. {city}, {street}. Контактный телефон {phone}, доб. {ext}",
+    "Паспорт {passport}, полис ОМС {policy}, СНИЛС {snils}.",
+    "Осмотрена доктором {SURNAME} {first} {patronymic}. Рекомендовано наблюдение у невролога.",
+    "Дата рождения: {date_short}. Направлена {date_words} в {org}.",
+    "Mr {latin_name} ({LATIN_SURNAME}) visited {city} on {date}, phone {intl_phone}.",
+    "Жалобы на головную боль. АД 120/80 мм рт. ст., ЧСС 72 уд/мин, анализ №{n}{n}{n}{n}.",
+    "{initials_first} {surname}, {krai} край / {oblast} область, ID {code}",
+    "Выписка ({surname} {initials_short}) отправлена на {email}; копия - {email2}",
+    "Контроль через неделю.\nЛечащий врач: {surname} {initials}\nЗав. отделением: {name}",
+]
+
+RELATIVE_ROLES = ["матери", "отца", "бабушки", "супруга", "дочери"]
+ORGS = ["ГБУЗ ГКБ №1", "клинику Медси", "поликлинику №45", "ООО \"Клиника Здоровье\"", "НИИТО им. Гельмгольца"]
+KRAI = ["Краснодарский", "Пермский", "Алтайского", "Ставропольскому"]
+OBLAST = ["Московская", "Ростовской", "Томскую", "Нижегородской"]
+MONTHS = ["января", "февраля", "марта", "апреля", "мая", "июня", "июля", "августа", "сентября", "октября",
+          "ноября", "декабря"]
+
+
+def _fields(rnd: random.Random, person: Person, latin: Person, address: Address, dt: Datetime) -> dict:
+    surname = person.last_name()
+    first = person.first_name()
+    initials = f"{first[0]}.{person.first_name()[0]}."
+    date = dt.date(start=1950, end=2024)
+    return {
+        "name": person.full_name(reverse=rnd.random() < 0.5),
+        "surname": surname,
+        "SURNAME": surname.upper(),
+        "first": first,
+        "patronymic": person.last_name()[:-2] + "овна" if rnd.random() < 0.5 else person.first_name() + "ович",
+        "initials": initials,
+        "initials_short": initials.replace(".", ""),
+        "initials_first": f"{first[0]}.",
+        "year": rnd.randint(1930, 2020),
+        "date": date.strftime("%d.%m.%Y"),
+        "date_short": date.strftime("%d/%m/%y"),
+        "date_words": f"{date.day} {rnd.choice(MONTHS)} {date.year}",
+        "phone": person.phone_number(mask=rnd.choice(["+7 (9##) ###-##-##", "8-9##-###-##-##", "8(4##)###-##-##",
+                                                      "+7-(9##)-###-##-##", "###-##-##"])),
+        "intl_phone": latin.phone_number(mask="+1 (###) ###-####"),
+        "ext": rnd.randint(10, 9999),
+        "email": person.email(),
+        "email2": latin.email(),
+        "city": address.city(),
+        "region": address.region(),
+        "street": address.address(),
+        "krai": rnd.choice(KRAI),
+        "oblast": rnd.choice(OBLAST),
+        "org": rnd.choice(ORGS),
+        "relative_role": rnd.choice(RELATIVE_ROLES),
+        "latin_name": latin.full_name(),
+        "LATIN_SURNAME": latin.last_name().upper(),
+        "passport": f"{rnd.randint(1000, 9999)} {rnd.randint(100000, 999999)}",
+        "policy": "".join(str(rnd.randint(0, 9)) for _ in range(16)),
+        "snils": f"{rnd.randint(100, 999)}-{rnd.randint(100, 999)}-{rnd.randint(100, 999)} {rnd.randint(10, 99)}",
+        "code": f"AB{rnd.randint(1000, 99999)}X",
+        "n": rnd.randint(1, 9),
+    }
+
+
+def build_corpus(size: int = 300, seed: int = 0) -> List[str]:
+    """`size` texts of 1-4 templated sentences each, the same for the same seed (and mimesis version)."""
+    rnd = random.Random(seed)
+    person, latin = Person(Locale.RU, seed=seed), Person(Locale.EN, seed=seed)
+    address, dt = Address(Locale.RU, seed=seed), Datetime(Locale.RU, seed=seed)
+
+    texts = list(SAMPLE_TEXTS)
+    while len(texts) < size:
+        sentences = [rnd.choice(TEMPLATES).format(**_fields(rnd, person, latin, address, dt))
+                     for _ in range(rnd.randint(1, 4))]
+        texts.append(rnd.choice([" ", "\n"]).join(sentences))
+    return texts[:size]
+
+
+if __name__ == "__main__":
+    for text in build_corpus(10):
+        print(text, end="\n\n")
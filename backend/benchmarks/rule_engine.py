@@ -0,0 +1,124 @@
+# python -m backend.benchmarks.rule_engine [--repeat 5] [--update]
+"""
+Rule engine regression check and benchmark: the entities found on the corpus of `rule_corpus` must be
+the same as in `data/rule_regression.jsonl` (written with `--update`), then the engine is timed against
+the unguarded patterns compiled on every call, as the rules did before. The context name patterns are timed
+as full-text regexes and around their keywords, and the comma-separated fragments of the corpus are scanned
+one by one (like the short values of a DB column) with and without the prefilters of the families.
+"""
+import os
+import re
+import json
+import time
+import argparse
+
+from loguru import logger
+
+from backend.benchmarks.rule_corpus import build_corpus
+from backend.utils.postprocessing.rules import RULES
+from backend.utils.postprocessing.rule_engine import RuleEngine
+from backend.utils.postprocessing.dictionaries import DICTIONARIES
+from backend.utils.postprocessing.contacts.rules_contacts import PATTERN_CONTACTS, PATTERN_PHONE_WITH_EXTENSION
+from backend.utils.postprocessing.dates.rules_dates import PATTERN_DATES
+from backend.utils.postprocessing.per.rules_names import (PATTERN_GENERAL, PATTERN_GENERAL_LATIN, PATTERN_PARENTHESES,
+                                                          CONTEXT)
+from backend.utils.postprocessing.per.patterns import specific
+from backend.utils.postprocessing.other.rules_other import PATTERN_IDS, PATTERN_SEQUENCES_WITH_DIGITS
+
+SNAPSHOT = os.path.join(os.path.dirname(__file__), "data", "rule_regression.jsonl")
+
+LEGACY_REGIONS = (
+    r'\b(\w+ого|\w+ому|\w+ым|\w+ом|\w+ая|\w+ой|\w+ую)\s+кра[еёюи]\b|'
+    r'\b(\w+ой|\w+ая|\w+ую|\w+ой)\s+област[иью]\b'
+)
+
+# The patterns scanned by the rules, as they were written before the first-character guards
+LEGACY_PATTERNS = {
+    'phone_with_extension': (PATTERN_PHONE_WITH_EXTENSION, 0),
+    'contacts': (PATTERN_CONTACTS, 0),
+    'dates': (PATTERN_DATES, re.IGNORECASE),
+    'names': (PATTERN_GENERAL, 0),
+    'names_latin': (PATTERN_GENERAL_LATIN, 0),
+    'names_parentheses': (PATTERN_PARENTHESES, 0),
+    'regions': (LEGACY_REGIONS, 0),
+    'ids': (PATTERN_IDS, 0),
+    'digit_sequences': (PATTERN_SEQUENCES_WITH_DIGITS, 0),
+}
+
+
+def check(texts: list, update: bool = False) -> bool:
+    found = [[list(ent) for ent in RULES.find(text)] for text in texts]
+    if update:
+        with open(SNAPSHOT, "w") as f:
+            f.writelines(json.dumps({"text": text, "entities": ents}, ensure_ascii=False) + "\n"
+                         for text, ents in zip(texts, found))
+        print(f"snapshot updated: {len(texts)} texts, {sum(len(ents) for ents in found)} entities")
+        return True
+
+    with open(SNAPSHOT) as f:
+        cases = [json.loads(line) for line in f]
+    mismatches = [text for case, text, ents in zip(cases, texts, found)
+                  if case["text"] != text or case["entities"] != ents]
+    print(f"regression: {len(cases) - len(mismatches)}/{len(cases)} texts with the same entities")
+    for text in mismatches[:5]:
+        print(f"  mismatch: {text[:100]!r}")
+    return not mismatches
+
+
+def _legacy_scan(text: str) -> int:
+    return sum(1 for pattern, flags in LEGACY_PATTERNS.values() for _ in re.finditer(pattern, text, flags))
+
+
+def _context_regex_scan(text: str) -> int:
+    return sum(1 for name in ("PATTERN_1", "PATTERN_2", "PATTERN_3", "PATTERN_5", "PATTERN_6")
+               for _ in re.finditer(getattr(specific, name), text))
+
+
+def _context_trigger_scan(text: str) -> int:
+    return sum(1 for _ in CONTEXT.finditer(text))
+
+
+def _engine_scan(text: str) -> int:
+    # without the dictionaries and the name filters, the same work as `_legacy_scan`
+    return sum(len(ents) for name, ents in RULES.scan(text).items() if name not in ('orgs', 'locations'))
+
+
+def _best(fn, arg, repeat: int) -> float:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        fn(arg)
+        timings.append(time.perf_counter() - started)
+    return min(timings)
+
+
+def benchmark(texts: list, repeat: int) -> None:
+    text = "\n".join(texts)
+    for name, scan in (("legacy", _legacy_scan), ("engine", _engine_scan),
+                       ("context regexes", _context_regex_scan), ("context triggers", _context_trigger_scan)):
+        print(f"{name}: {len(text)} chars, best of {repeat}: {_best(scan, text, repeat) * 1000:8.1f} ms")
+
+    cells = [cell.strip() for cell in re.split(r'[,;\n]', text) if cell.strip()]
+    unfiltered = RuleEngine([family._replace(prefilter=None) for family in RULES.families])
+    for name, engine in (("no prefilters", unfiltered), ("prefilters", RULES)):
+        seconds = _best(lambda batch: [engine.scan(cell) for cell in batch], cells, repeat)
+        print(f"{name}: {len(cells)} short texts one by one, best of {repeat}: {seconds * 1000:8.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--update", action="store_true", help="rewrite the snapshot with the current entities")
+    args = parser.parse_args()
+
+    logger.remove()
+    DICTIONARIES.matcher('LOC'), DICTIONARIES.matcher('ORG')  # load before timing
+    texts = build_corpus()
+    same = check(texts, update=args.update)
+    benchmark(texts, args.repeat)
+    if not same:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,31 +1,57 @@
 import os
+from concurrent.futures import ThreadPoolExecutor
 from typing import Callable
 from fastapi import FastAPI
 from loguru import logger
 
 from backend.services.ml_model import SpacyModel, TestModel
+from backend.services.batcher import MicroBatcher, INFERENCE_WORKERS
+from backend.services.process_pool import InferencePool, INFERENCE_PROCESSES
+from backend.services.model_server import RemoteModel
 # from backend.services.pd_generator import PersonalDataGenerator
 from backend.core.db import connect_to_db, close_db_connection
 
 CONNECT_TO_DB = os.getenv("CONNECT_TO_DB", "True").lower() in ("true", "1")
 logger.info(f"CONNECT_TO_DB: {CONNECT_TO_DB}")
+MODEL_SERVING = os.getenv("MODEL_SERVING", "local").lower()  # local - model per worker, shared - model server
 
 
 async def _startup_model(app: FastAPI) -> None:
     # Load the model
     try:
-        logger.info("Attempting to load model.")
-        app.state.model = SpacyModel()
+        if MODEL_SERVING == "shared":
+            logger.info("Connecting to the shared model server.")
+            app.state.model = RemoteModel()
+        else:
+            logger.info("Attempting to load model.")
+            app.state.model = SpacyModel()
     except Exception as e:
         logger.error(f"Failed to load model: {e}")
         app.state.model = TestModel()
 
     app.state.model_name = app.state.model.model_name
 
+    # Dedicated executor keeps CPU-bound inference off the event loop (its threads start on the first call)
+    app.state.executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+
+    # Process pool for table anonymization jobs, forked after the model is loaded
+    app.state.process_pool = None
+    if INFERENCE_PROCESSES > 1 and isinstance(app.state.model, SpacyModel):
+        app.state.process_pool = InferencePool(app.state.model, processes=INFERENCE_PROCESSES,
+                                               executor=app.state.executor)
+
+    # Shared micro-batcher for concurrent inference requests
+    app.state.batcher = MicroBatcher(app.state.model, executor=app.state.executor)
+    await app.state.batcher.start()
+
 
 async def _shutdown_model(app: FastAPI) -> None:
     logger.info("Running app shutdown handler.")
-    # Unload the model
+    # Stop batching and unload the model
+    await app.state.batcher.stop()
+    app.state.executor.shutdown(wait=False, cancel_futures=True)
+    if app.state.process_pool is not None:
+        app.state.process_pool.shutdown()
     app.state.model = None
 
 
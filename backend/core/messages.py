@@ -1,6 +1,7 @@
 NO_API_KEY = "No API key provided."
 AUTH_REQ = "Authentication required."
 HTTP_500_DETAIL = "Internal server error."
+QUEUE_FULL = "Inference queue is full, please retry later."
 
 # templates
 NO_VALID_PAYLOAD = "{} is not a valid payload."
\ No newline at end of file
@@ -11,6 +11,11 @@ class ConfigNER(BaseModel):
     fuzzy_match: bool = Field(default=False, description="Whether to use fuzzy matching for names.")
     per_list_label: bool = Field(default=False, description="Whether to use different label for names from the list")
     remove_html: bool = Field(default=False, description="Whether to remove html tags from the text.")
+    sentence_level: bool = Field(default=False, description="Whether to detect entities sentence by sentence "
+                                                            "(cached per sentence, fast for templated texts).")
+    rules_enabled: Union[List[str], None] = Field(default=None, description="Rule families to run even if their "
+                                                                            "entities are not requested.")
+    rules_disabled: Union[List[str], None] = Field(default=None, description="Rule families not to run.")
 
 
 class BatchInput(BaseModel):
@@ -0,0 +1,201 @@
+import os
+import json
+import asyncio
+from collections import deque
+from functools import partial
+from concurrent.futures import Executor
+from typing import Any, Deque, Dict, List, NamedTuple, Optional
+
+from loguru import logger
+
+from backend.models.payload import DatabaseDataPayload
+
+BATCH_WINDOW_MS = float(os.getenv("BATCH_WINDOW_MS", 5))
+MAX_BATCH_SIZE = int(os.getenv("MAX_BATCH_SIZE", 64))
+INFERENCE_WORKERS = int(os.getenv("INFERENCE_WORKERS", 1))
+INFERENCE_QUEUE_SIZE = int(os.getenv("INFERENCE_QUEUE_SIZE", 256))
+STATS_WINDOW = 1000  # number of recent batches used for percentiles
+
+
+class QueueFullError(Exception):
+    """Raised when the inference queue can not accept more texts."""
+
+
+class _QueuedText(NamedTuple):
+    payload: DatabaseDataPayload
+    options: Dict[str, Any]
+    key: str
+    future: asyncio.Future
+    enqueued_at: float
+
+
+def _options_key(options: Dict[str, Any]) -> str:
+    return json.dumps(options, sort_keys=True, default=str)
+
+
+def _percentile(values, q):
+    if not values:
+        return 0.0
+    values = sorted(values)
+    return values[min(len(values) - 1, int(q * len(values)))]
+
+
+class MicroBatcher:
+    """
+    Collects texts from concurrent requests and runs them through the model together.
+
+    Texts are queued with their prediction options; the background loop waits up to `window_ms`
+    after the oldest queued text (or until `max_batch_size` texts are queued), then runs one
+    `predict_many` call for the texts sharing the options of the oldest one and resolves
+    every caller's future with its own predictions.
+
+    Batches run on `executor` (at most `workers` at a time), so the event loop stays free while
+    the model works. Queued and in-flight texts are bounded by `max_queue_size`: above it
+    `submit` raises `QueueFullError` instead of queueing.
+    """
+
+    def __init__(self, model, window_ms: float = BATCH_WINDOW_MS, max_batch_size: int = MAX_BATCH_SIZE,
+                 executor: Optional[Executor] = None, workers: int = INFERENCE_WORKERS,
+                 max_queue_size: int = INFERENCE_QUEUE_SIZE):
+        self.model = model
+        self.window = window_ms / 1000
+        self.max_batch_size = max_batch_size
+        self.executor = executor
+        self.max_queue_size = max_queue_size
+        self._queue: Deque[_QueuedText] = deque()
+        self._arrived = asyncio.Event()
+        self._slots = asyncio.Semaphore(workers)
+        self._in_flight = 0
+        self._rejected = 0
+        self._flushes = set()
+        self._task = None
+
+        self._batches = 0
+        self._texts = 0
+        self._max_seen = 0
+        self._recent_sizes: Deque[int] = deque(maxlen=STATS_WINDOW)
+        self._recent_waits: Deque[float] = deque(maxlen=STATS_WINDOW)
+
+    async def start(self) -> None:
+        if self._task is None:
+            logger.info(f"Starting micro-batcher: window={self.window * 1000:.1f} ms, "
+                        f"max batch size={self.max_batch_size}")
+            self._task = asyncio.create_task(self._loop())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+        while self._queue:
+            item = self._queue.popleft()
+            if not item.future.done():
+                item.future.cancel()
+
+    async def submit(self, batch: List[DatabaseDataPayload], **options) -> List[dict]:
+        """Queue texts for prediction and wait for their results (same shape as `predict_many`)."""
+        pending = len(self._queue) + self._in_flight
+        if pending and pending + len(batch) > self.max_queue_size:
+            self._rejected += 1
+            raise QueueFullError(f"{pending} texts are already waiting for inference")
+
+        loop = asyncio.get_running_loop()
+        key = _options_key(options)
+        futures = []
+        for payload in batch:
+            future = loop.create_future()
+            self._queue.append(_QueuedText(payload, options, key, future, loop.time()))
+            futures.append(future)
+        self._arrived.set()
+        return list(await asyncio.gather(*futures))
+
+    def stats(self) -> dict:
+        return {
+            "queue_depth": len(self._queue),
+            "in_flight": self._in_flight,
+            "rejected_requests": self._rejected,
+            "batches": self._batches,
+            "texts": self._texts,
+            "mean_batch_size": round(self._texts / self._batches, 2) if self._batches else 0.0,
+            "max_batch_size": self._max_seen,
+            "p50_batch_size": _percentile(self._recent_sizes, 0.5),
+            "p50_wait_ms": round(_percentile(self._recent_waits, 0.5) * 1000, 2),
+            "p99_wait_ms": round(_percentile(self._recent_waits, 0.99) * 1000, 2),
+            "window_ms": self.window * 1000,
+            "batch_size_limit": self.max_batch_size,
+        }
+
+    async def _loop(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            if not self._queue:
+                self._arrived.clear()
+                await self._arrived.wait()
+
+            deadline = self._queue[0].enqueued_at + self.window
+            while len(self._queue) < self.max_batch_size:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                self._arrived.clear()
+                try:
+                    await asyncio.wait_for(self._arrived.wait(), timeout)
+                except asyncio.TimeoutError:
+                    break
+
+            await self._slots.acquire()
+            batch = self._take_batch()
+            self._in_flight += len(batch)
+            flush = asyncio.create_task(self._flush(batch))
+            self._flushes.add(flush)
+            flush.add_done_callback(self._flushes.discard)
+
+    def _take_batch(self) -> List[_QueuedText]:
+        key = self._queue[0].key
+        batch, rest = [], deque()
+        for item in self._queue:
+            if item.key == key and len(batch) < self.max_batch_size:
+                batch.append(item)
+            else:
+                rest.append(item)
+        self._queue = rest
+        return batch
+
+    async def _flush(self, batch: List[_QueuedText]) -> None:
+        try:
+            await self._predict([item for item in batch if not item.future.done()])  # skip cancelled callers
+        finally:
+            self._in_flight -= len(batch)
+            self._slots.release()
+
+    async def _predict(self, batch: List[_QueuedText]) -> None:
+        if not batch:
+            return
+        self._record(batch)
+        loop = asyncio.get_running_loop()
+        try:
+            predictions = await loop.run_in_executor(
+                self.executor,
+                partial(self.model.predict_many, [item.payload for item in batch], **batch[0].options)
+            )
+        except Exception as e:
+            logger.error(f"Failed to process micro-batch of {len(batch)} texts: {e}")
+            for item in batch:
+                if not item.future.done():
+                    item.future.set_exception(e)
+            return
+
+        for item, prediction in zip(batch, predictions):
+            if not item.future.done():
+                item.future.set_result(prediction)
+
+    def _record(self, batch: List[_QueuedText]) -> None:
+        now = asyncio.get_running_loop().time()
+        self._batches += 1
+        self._texts += len(batch)
+        self._max_seen = max(self._max_seen, len(batch))
+        self._recent_sizes.append(len(batch))
+        self._recent_waits.extend(now - item.enqueued_at for item in batch)
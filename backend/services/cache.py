@@ -0,0 +1,104 @@
+import os
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Hashable, NamedTuple, Optional
+
+RESULT_CACHE_BYTES = int(os.getenv("RESULT_CACHE_BYTES", 64 * 1024 * 1024))  # 0 - cache disabled
+RESULT_CACHE_TTL = float(os.getenv("RESULT_CACHE_TTL", 0))  # seconds, 0 - entries never expire
+SENTENCE_CACHE_BYTES = int(os.getenv("SENTENCE_CACHE_BYTES", 64 * 1024 * 1024))  # 0 - cache disabled
+CHECKLIST_CACHE_BYTES = int(os.getenv("CHECKLIST_CACHE_BYTES", 256 * 1024 * 1024))  # 0 - cache disabled
+
+
+class Entity(NamedTuple):
+    """Detached entity with the attributes of a spaCy span used for hiding."""
+    start_char: int
+    end_char: int
+    label_: str
+    text: str
+
+
+def make_key(text: str, *parts: Any) -> str:
+    """Hash of a text and the options that affect its result."""
+    digest = hashlib.sha256(text.encode("utf-8"))
+    digest.update(json.dumps(parts, sort_keys=True, default=str).encode("utf-8"))
+    return digest.hexdigest()
+
+
+class LRUCache:
+    """
+    Thread-safe LRU cache with a byte budget and an optional TTL.
+
+    Sizes are estimated by the caller (`put(key, value, size)`); least recently used entries
+    are evicted once the total size exceeds `max_bytes`.
+    """
+
+    def __init__(self, max_bytes: int = RESULT_CACHE_BYTES, ttl: float = RESULT_CACHE_TTL):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._data = OrderedDict()  # key -> (value, size, expires_at)
+        self._lock = threading.Lock()
+        self._bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_bytes > 0
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        if not self.enabled:
+            return None
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, size, expires_at = item
+            if expires_at and expires_at < time.monotonic():
+                self._remove(key)
+                self.expirations += 1
+                self.misses += 1
+                return None
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key: Hashable, value: Any, size: int) -> None:
+        if not self.enabled or size > self.max_bytes:
+            return
+        expires_at = time.monotonic() + self.ttl if self.ttl else 0
+        with self._lock:
+            if key in self._data:
+                self._remove(key)
+            self._data[key] = (value, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                self._remove(next(iter(self._data)))
+                self.evictions += 1
+
+    def clear(self) -> None:
+        with self._lock:
+            self._data.clear()
+            self._bytes = 0
+
+    def stats(self) -> dict:
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._data),
+            "bytes": self._bytes,
+            "max_bytes": self.max_bytes,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": round(self.hits / lookups, 4) if lookups else 0.0,
+            "evictions": self.evictions,
+            "expirations": self.expirations,
+        }
+
+    def _remove(self, key: Hashable) -> None:
+        _, size, _ = self._data.pop(key)
+        self._bytes -= size
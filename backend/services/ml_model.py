@@ -1,19 +1,73 @@
 import os
-import spacy
 from spacy import displacy
-from typing import List, Union
+from typing import List, Tuple, Union
 
 from backend.core.messages import NO_VALID_PAYLOAD
 from backend.models.payload import DatabaseDataPayload
-from backend.utils.postprocessing.add_ents import add_custom_entities_to_doc
-from backend.utils.postprocessing.hide_data import hide_ents_in_doc
+from backend.utils.postprocessing.add_ents import add_checklist_entities_to_doc, add_custom_entities_to_doc
+from backend.utils.postprocessing.dictionaries import DICTIONARIES
+from backend.utils.postprocessing.hide_data import hide_ents_with_offsets, map_offset
+from backend.utils.postprocessing.match_dict import compile_names_matcher
 from backend.utils.preprocessing.prepare_text import preprocess
+from backend.utils.preprocessing.split_text import split_chunks, split_sentences
 from backend.services.pd_generator import PersonalDataGenerator
+from backend.services.pipeline import load_pipeline
+from backend.services.cache import Entity, LRUCache, make_key, CHECKLIST_CACHE_BYTES, SENTENCE_CACHE_BYTES
 
 MODELS_PATH = os.getenv("MODELS_PATH", "./backend/checkpoints/")
 DEFAULT_MODEL = os.getenv("SPACY_MODEL", "ru_core_news_md")
 BEST_MODEL = os.getenv("BEST_MODEL", "model_018")
+BATCH_SIZE = int(os.getenv("BATCH_SIZE", 32))
+LONG_DOC_CHARS = int(os.getenv("LONG_DOC_CHARS", 10000))  # longer texts are processed in chunks
+LONG_DOC_OVERLAP = int(os.getenv("LONG_DOC_OVERLAP", 200))
 ENTITIES_TO_HIDE = ["SENSITIVE", "CONTACTS", "DATE", "LOC", "ORG", "PER"]
+RULE_LABELS = {"SENSITIVE", "CONTACTS", "DATE"}  # labels produced by the regex rules
+
+
+def _entities_size(ents) -> int:
+    """Rough memory footprint of a cached detection result, in bytes."""
+    return 120 + sum(160 + 2 * len(text) for _, _, _, text in ents)
+
+
+def _matcher_size(names) -> int:
+    """Rough memory footprint of a compiled names matcher (4 case variants per name), in bytes."""
+    return 1000 + 4 * 100 * sum(len(name) for name in names)
+
+
+def _ner_labels(nlp) -> set:
+    """Labels the NER component of the pipeline can predict."""
+    return set(nlp.get_pipe("ner").labels) if "ner" in nlp.pipe_names else set()
+
+
+def _rules_only(use_rules, ents_to_hide, ner_labels=()) -> bool:
+    """
+    Whether the NER model can be skipped and only the rules run (regex-only fast path). The model is skipped
+    only if it can't predict any of the requested labels (with `model_018`, which predicts CONTACTS and DATE
+    too, only for SENSITIVE), so the fast path loses nothing.
+    """
+    return bool(use_rules and ents_to_hide is not None and set(ents_to_hide) <= RULE_LABELS - set(ner_labels))
+
+
+def _rule_labels(ents_to_hide):
+    """
+    Labels to run the rule families for: the requested ones (all if None). The rule engine adds the labels
+    they compete with for overlapping spans (see `RuleEngine.plan`).
+    """
+    return None if ents_to_hide is None else sorted(set(ents_to_hide))
+
+
+def _engine(use_rules, ents_to_hide, ner_labels=()) -> str:
+    return "rules" if _rules_only(use_rules, ents_to_hide, ner_labels) else "model"
+
+
+def _remove_overlaps(ents: list) -> list:
+    """Drop entities overlapping a previous (or a longer) one, e.g. found on both sides of a chunk boundary."""
+    kept = []
+    for ent in sorted(ents, key=lambda ent: (ent[0], ent[0] - ent[1])):
+        if kept and ent[0] < kept[-1][1]:
+            continue
+        kept.append(ent)
+    return kept
 
 
 class ModelConfig(object):
@@ -42,8 +96,12 @@ class SpacyModel:
         print("Initializing Spacy Model...")
         self.model_name = model_name
         model_full_path = MODELS_PATH + model_name
-        self.model = spacy.load(model_full_path)
+        self.model = load_pipeline(model_full_path)
+        self.ner_labels = _ner_labels(self.model)
         self.pd_generator = PersonalDataGenerator(consistency=True)
+        self.result_cache = LRUCache()
+        self.sentence_cache = LRUCache(max_bytes=SENTENCE_CACHE_BYTES)
+        self.checklist_cache = LRUCache(max_bytes=CHECKLIST_CACHE_BYTES)
         self.is_loaded = True
 
     def __enter__(self):
@@ -62,60 +120,256 @@ class SpacyModel:
 
     def predict(self, payload: DatabaseDataPayload, use_rules=True, use_base_model=False,
                 placeholder=None, ents_to_hide=None, checklist=None, filters=None, fuzzy_match=False,
-                per_list_label=False, remove_html=False):
+                per_list_label=False, remove_html=False, sentence_level=False, rules_enabled=None,
+                rules_disabled=None):
         if not self.is_loaded:
             raise ValueError("Model not loaded")
         if not payload:
             raise ValueError(NO_VALID_PAYLOAD)
+        engine = _engine(use_rules, ents_to_hide, self.ner_labels)
         if payload.data is None:
-            return {"personal_data": [], "text": "", "original_text": ""}
+            return {"personal_data": [], "text": "", "original_text": "", "engine": engine}
 
         # Preprocess text
         payload.data = preprocess(payload.data, remove_html_tags=remove_html)
 
-        # Process text with the model
-        doc = self.model(payload.data)
-
-        # Post-process the results with custom rules
-        ents = self._post_process(doc, jsonify=True, use_rules=use_rules, use_base_model=use_base_model,
-                                  checklist=checklist, filters=filters, fuzzy_match=fuzzy_match,
-                                  per_list_label=per_list_label)
-
-        # Hide sensitive data
-        txt = hide_ents_in_doc(doc, placeholder=placeholder, ents_to_hide=ents_to_hide)
+        # Process text with the model, post-process the results with custom rules and hide sensitive data
+        ents, txt, original_text = next(self._pipe([payload.data], use_rules=use_rules, use_base_model=use_base_model,
+                                                   placeholder=placeholder, ents_to_hide=ents_to_hide,
+                                                   checklist=checklist, filters=filters, fuzzy_match=fuzzy_match,
+                                                   per_list_label=per_list_label, sentence_level=sentence_level,
+                                                   rules_enabled=rules_enabled, rules_disabled=rules_disabled))
 
-        return {"personal_data": ents, "text": txt, "original_text": doc.text}
+        return {"personal_data": ents, "text": txt, "original_text": original_text, "engine": engine}
 
     def predict_batch(self, batch: List[DatabaseDataPayload], use_rules=True, use_base_model=False,
                       placeholder=None, ents_to_hide=None, checklist=None, filters=None, fuzzy_match=False,
-                      per_list_label=False, remove_html=False):
+                      per_list_label=False, remove_html=False, batch_size=BATCH_SIZE, sentence_level=False,
+                      rules_enabled=None, rules_disabled=None):
+        texts, detected = self.detect_batch(batch, use_rules=use_rules, use_base_model=use_base_model,
+                                            ents_to_hide=ents_to_hide, checklist=checklist, filters=filters,
+                                            fuzzy_match=fuzzy_match, per_list_label=per_list_label,
+                                            remove_html=remove_html, batch_size=batch_size,
+                                            sentence_level=sentence_level, rules_enabled=rules_enabled,
+                                            rules_disabled=rules_disabled)
+        return self.hide_batch(texts, detected, use_rules=use_rules, placeholder=placeholder,
+                               ents_to_hide=ents_to_hide)
+
+    def detect_batch(self, batch: List[DatabaseDataPayload], ents_to_hide=None, remove_html=False,
+                     batch_size=BATCH_SIZE, placeholder=None, **detect_options) -> Tuple[List[str], List[list]]:
+        """
+        First half of `predict_batch`: preprocessed texts and the entities `(start, end, label, text)`
+        found in them, nothing is hidden (the inference pool workers run this half).
+        """
         if not self.is_loaded:
             raise ValueError("Model not loaded")
         if not batch:
             raise ValueError(NO_VALID_PAYLOAD)
-        batch = [preprocess(text.data, remove_html_tags=remove_html) for text in batch]
-        docs = self.model.pipe(batch)
+        texts = [preprocess(text.data, remove_html_tags=remove_html) for text in batch]
+        return texts, self._detect_labels(texts, ents_to_hide, batch_size=batch_size, **detect_options)
+
+    def hide_batch(self, texts: List[str], detected: List[list], use_rules=True, placeholder=None,
+                   ents_to_hide=None, **_) -> dict:
+        """Second half of `predict_batch`: hide the detected entities with the model's generator."""
         ents_list, txt_list = [], []
-        for doc in docs:
-            ents = self._post_process(doc, jsonify=True, use_rules=use_rules, use_base_model=use_base_model,
-                                      checklist=checklist, filters=filters, fuzzy_match=fuzzy_match,
-                                      per_list_label=per_list_label)
-            txt = hide_ents_in_doc(doc, placeholder=placeholder, ents_to_hide=ents_to_hide,
-                                   pd_generator=self.pd_generator)
+        for ents, txt, _ in self._hide(texts, detected, placeholder=placeholder, ents_to_hide=ents_to_hide,
+                                       pd_generator=self.pd_generator):
             ents_list.append(ents)
             txt_list.append(txt)
 
-        return {"personal_data": ents_list, "text": txt_list, "original_text": batch}
+        return {"personal_data": ents_list, "text": txt_list, "original_text": texts,
+                "engine": _engine(use_rules, ents_to_hide, self.ner_labels)}
+
+    def predict_many(self, batch: List[DatabaseDataPayload], use_rules=True, use_base_model=False,
+                     placeholder=None, ents_to_hide=None, checklist=None, filters=None, fuzzy_match=False,
+                     per_list_label=False, remove_html=False, batch_size=BATCH_SIZE,
+                     sentence_level=False, rules_enabled=None, rules_disabled=None) -> List[dict]:
+        """
+        Batched counterpart of `predict`: all texts go through a single `nlp.pipe` call,
+        the result is a list with one `predict`-shaped dict per text (in the input order).
+        """
+        if not self.is_loaded:
+            raise ValueError("Model not loaded")
+
+        engine = _engine(use_rules, ents_to_hide, self.ner_labels)
+        predictions = [{"personal_data": [], "text": "", "original_text": "", "engine": engine} for _ in batch]
+        idx = [i for i, payload in enumerate(batch) if payload.data is not None]
+        texts = [preprocess(batch[i].data, remove_html_tags=remove_html) for i in idx]
+
+        results = self._pipe(texts, use_rules=use_rules, use_base_model=use_base_model,
+                             placeholder=placeholder, ents_to_hide=ents_to_hide, checklist=checklist,
+                             filters=filters, fuzzy_match=fuzzy_match, per_list_label=per_list_label,
+                             batch_size=batch_size, sentence_level=sentence_level,
+                             rules_enabled=rules_enabled, rules_disabled=rules_disabled)
+        for i, (ents, txt, original_text) in zip(idx, results):
+            predictions[i] = {"personal_data": ents, "text": txt, "original_text": original_text, "engine": engine}
+
+        return predictions
+
+    def _pipe(self, texts: List[str], placeholder=None, ents_to_hide=None, pd_generator=None,
+              batch_size=BATCH_SIZE, **detect_options):
+        """
+        Detect entities in preprocessed texts and hide them,
+        yields `(entities, hidden_text, original_text)` per text.
+        """
+        detected = self._detect_labels(texts, ents_to_hide, batch_size=batch_size, **detect_options)
+        return self._hide(texts, detected, placeholder=placeholder, ents_to_hide=ents_to_hide,
+                          pd_generator=pd_generator)
+
+    def _detect_labels(self, texts: List[str], ents_to_hide=None, batch_size=BATCH_SIZE, **detect_options):
+        """
+        Entities per text for the requested labels: only the rule families of these labels are run. If only
+        labels produced by the regex rules and not by the NER model are requested (and the rules are on),
+        the NER model is skipped and only the rules are run.
+        """
+        rules_only = _rules_only(detect_options.get("use_rules", True), ents_to_hide, self.ner_labels)
+        return self._detect(texts, batch_size=batch_size, rules_only=rules_only,
+                            rule_labels=_rule_labels(ents_to_hide), **detect_options)
+
+    @staticmethod
+    def _hide(texts: List[str], detected: List[list], placeholder=None, ents_to_hide=None, pd_generator=None):
+        if ents_to_hide is not None and "PER" in ents_to_hide:
+            ents_to_hide = list(ents_to_hide) + ["PER_LIST"]  # names from the checklist with `per_list_label`
+        for text, ents in zip(texts, detected):
+            entities = [Entity(start, end, label, ent_text) for start, end, label, ent_text in ents]
+            txt, offsets = hide_ents_with_offsets(text, entities, placeholder=placeholder, ents_to_hide=ents_to_hide,
+                                                  pd_generator=pd_generator)
+            # `hidden_start` / `hidden_end`: the entity (or its replacement) in the hidden text
+            yield [{"start": start, "end": end, "label": label, "text": ent_text,
+                    "hidden_start": map_offset(offsets, start), "hidden_end": map_offset(offsets, end)}
+                   for start, end, label, ent_text in ents], txt, text
+
+    def _detect(self, texts: List[str], batch_size=BATCH_SIZE, sentence_level=False, **options) -> List[list]:
+        """
+        Entities `(start, end, label, text)` per text. Texts that were already seen with the same
+        detection options (and the same dictionaries) are served from the result cache, the rest go
+        through one `nlp.pipe` call (per text or, with `sentence_level`, per sentence).
+        """
+        options_key = make_key("", options, sentence_level, DICTIONARIES.version())
+        keys = [make_key(text, options_key) for text in texts]
+        results = [self.result_cache.get(key) for key in keys]
+
+        misses = {}  # key -> positions of the text in the batch
+        for i, (key, result) in enumerate(zip(keys, results)):
+            if result is None:
+                misses.setdefault(key, []).append(i)
+        if not misses:
+            return results
+
+        unseen = [texts[positions[0]] for positions in misses.values()]
+        if sentence_level:
+            detected = self._detect_sentences(unseen, batch_size=batch_size, **options)
+        else:
+            detected = self._run_model(unseen, batch_size=batch_size, **options)
+
+        for (key, positions), ents in zip(misses.items(), detected):
+            self.result_cache.put(key, ents, size=_entities_size(ents))
+            for i in positions:
+                results[i] = ents
+
+        return results
+
+    def _detect_sentences(self, texts: List[str], batch_size=BATCH_SIZE, **options) -> List[list]:
+        """
+        Sentence-level detection for templated texts: entities are cached per sentence with offsets
+        relative to the sentence, only unseen sentences go through the model and the rules,
+        then the offsets are shifted back into the full text.
+        """
+        options_key = make_key("", options, DICTIONARIES.version())
+
+        sentences = []  # per text: (sentence start, sentence key)
+        found = {}  # key -> entities relative to the sentence
+        unseen = {}  # key -> sentence text
+        for text in texts:
+            spans = []
+            for start, end in split_sentences(text):
+                sentence = text[start:end]
+                key = make_key(sentence, options_key)
+                spans.append((start, key))
+                if key in found or key in unseen:
+                    continue
+                ents = self.sentence_cache.get(key)
+                if ents is None:
+                    unseen[key] = sentence
+                else:
+                    found[key] = ents
+            sentences.append(spans)
+
+        detected = self._run_model(list(unseen.values()), batch_size=batch_size, **options)
+        for key, ents in zip(unseen, detected):
+            found[key] = ents
+            self.sentence_cache.put(key, ents, size=_entities_size(ents))
+
+        results = []
+        for spans in sentences:
+            ents = []
+            for start, key in spans:
+                ents += [(start + s, start + e, label, ent_text) for s, e, label, ent_text in found[key]]
+            results.append(ents)
+        return results
+
+    def _run_model(self, texts: List[str], batch_size=BATCH_SIZE, **options) -> List[list]:
+        """
+        Run the model and the rules, entities `(start, end, label, text)` per text.
+
+        Texts longer than `LONG_DOC_CHARS` (or `nlp.max_length`) are split into overlapping chunks on paragraph / sentence
+        boundaries; all chunks go through the same `nlp.pipe` call as the short texts. Every chunk keeps
+        the entities starting in its part of the text (overlaps are split in the middle), the offsets
+        are shifted back into the full text.
+        """
+        options = dict(options, checklist=self._checklist_matcher(options.get("checklist")))
+        max_chars = min(LONG_DOC_CHARS, self.model.max_length)
+        chunks = []  # (text index, chunk start, chunk end, owned start, owned end)
+        for i, text in enumerate(texts):
+            spans = split_chunks(text, max_chars, LONG_DOC_OVERLAP) if len(text) > max_chars else [(0, len(text))]
+            owned_start = 0
+            for k, (start, end) in enumerate(spans):
+                owned_end = (spans[k + 1][0] + end) // 2 if k + 1 < len(spans) else len(text)
+                chunks.append((i, start, end, owned_start, owned_end))
+                owned_start = owned_end
+
+        results = [[] for _ in texts]
+        chunk_texts = (texts[i][start:end] for i, start, end, _, _ in chunks)
+        if not options.get("rules_only"):
+            docs = self.model.pipe(chunk_texts, batch_size=batch_size)
+        else:  # regex-only fast path: the tokenizer is enough to align the rule entities
+            docs = map(self.model.make_doc, chunk_texts)
+        for (i, start, _, owned_start, owned_end), doc in zip(chunks, docs):
+            results[i] += [(start + s, start + e, label, ent_text)
+                           for s, e, label, ent_text in self._post_process(doc, **options)
+                           if owned_start <= start + s < owned_end]
+
+        for i, text in enumerate(texts):
+            if len(text) > max_chars:
+                results[i] = _remove_overlaps(results[i])
+        return results
+
+    def _checklist_matcher(self, checklist):
+        """
+        Compiled matcher for a checklist of names. Clients send the same list with every request,
+        so matchers are cached by the hash of the list.
+        """
+        if not checklist:
+            return None
+        key = make_key("", checklist)
+        matcher = self.checklist_cache.get(key)
+        if matcher is None:
+            matcher = compile_names_matcher(checklist)
+            self.checklist_cache.put(key, matcher, size=_matcher_size(checklist))
+        return matcher
 
     @staticmethod
     def _post_process(spacy_doc, base_doc=None, use_rules=True, use_base_model=False, jsonify=False,
-                      checklist=None, filters=None, fuzzy_match=False, per_list_label=False):
-        if checklist is None:
-            checklist = 'DEFAULT'
+                      checklist=None, filters=None, fuzzy_match=False, per_list_label=False, rules_only=False,
+                      rule_labels=None, rules_enabled=None, rules_disabled=None):
         if use_base_model:
             pass
         if use_rules:
-            spacy_doc = add_custom_entities_to_doc(spacy_doc, base_doc)
+            spacy_doc = add_custom_entities_to_doc(spacy_doc, base_doc, checklist=checklist,
+                                                   per_list_label=per_list_label, labels=rule_labels,
+                                                   rules_enabled=rules_enabled, rules_disabled=rules_disabled)
+        elif checklist:
+            spacy_doc = add_checklist_entities_to_doc(spacy_doc, checklist, per_list_label=per_list_label)
         ents = [(ent.start_char, ent.end_char, ent.label_, ent.text) for ent in spacy_doc.ents]
 
         if jsonify:
@@ -0,0 +1,243 @@
+# python -m backend.services.model_server
+import os
+import json
+import time
+import socket
+import struct
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from typing import List
+
+from loguru import logger
+
+from backend.models.payload import DatabaseDataPayload
+from backend.services.batcher import MicroBatcher, QueueFullError, INFERENCE_WORKERS
+from backend.services.ml_model import SpacyModel
+from backend.services.pd_generator import ArrayGenerator
+from backend.utils.postprocessing.rules import RULES
+
+MODEL_SOCKET = os.getenv("MODEL_SOCKET", "/tmp/db-xxx-model.sock")
+MODEL_SERVER_TIMEOUT = float(os.getenv("MODEL_SERVER_TIMEOUT", 300))  # seconds to wait for the server on startup
+
+_HEADER = struct.Struct("!I")  # message length prefix
+
+
+class ModelServerError(Exception):
+    """Raised by `RemoteModel` when the model server fails to process a request."""
+
+
+def _encode(message: dict) -> bytes:
+    body = json.dumps(message, ensure_ascii=False).encode("utf-8")
+    return _HEADER.pack(len(body)) + body
+
+
+async def _read_message(reader: asyncio.StreamReader) -> dict:
+    (length,) = _HEADER.unpack(await reader.readexactly(_HEADER.size))
+    return json.loads(await reader.readexactly(length))
+
+
+def _recv_exactly(sock: socket.socket, n: int) -> bytes:
+    data = bytearray()
+    while len(data) < n:
+        part = sock.recv(n - len(data))
+        if not part:
+            raise ConnectionError("Model server closed the connection")
+        data += part
+    return bytes(data)
+
+
+class ModelServer:
+    """
+    Serves one loaded model to all API workers over a unix socket.
+
+    Every uvicorn worker talks to this process through `RemoteModel` instead of loading its own
+    copy of the model. `predict_many` calls from all workers go through one `MicroBatcher`,
+    so concurrent requests are batched together regardless of the worker that received them.
+    Messages are length-prefixed JSON.
+    """
+
+    def __init__(self, model):
+        self.model = model
+        self.executor = ThreadPoolExecutor(max_workers=INFERENCE_WORKERS, thread_name_prefix="inference")
+        self.batcher = MicroBatcher(model, executor=self.executor)
+        # surrogates for the generator strategies do not wait behind the queued predict batches
+        self.generator_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="generator")
+
+    async def serve(self, socket_path: str = MODEL_SOCKET) -> None:
+        if os.path.exists(socket_path):
+            os.remove(socket_path)
+        await self.batcher.start()
+        server = await asyncio.start_unix_server(self._handle, path=socket_path)
+        logger.info(f"Model server is listening on {socket_path}")
+        try:
+            async with server:
+                await server.serve_forever()
+        finally:
+            await self.batcher.stop()
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.generator_executor.shutdown(wait=False, cancel_futures=True)
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        try:
+            while True:
+                request = await _read_message(reader)
+                writer.write(_encode(await self._dispatch(request)))
+                await writer.drain()
+        except (asyncio.IncompleteReadError, ConnectionError):
+            pass
+        finally:
+            writer.close()
+
+    async def _dispatch(self, request: dict) -> dict:
+        method = request.get("method")
+        options = request.get("options", {})
+        batch = [DatabaseDataPayload(data=text) for text in request.get("texts", [])]
+        loop = asyncio.get_running_loop()
+        try:
+            if method == "info":
+                result = {"model_name": self.model.model_name}
+            elif method == "stats":
+                result = {"batcher": self.batcher.stats(),
+                          "result_cache": self.model.result_cache.stats(),
+                          "sentence_cache": self.model.sentence_cache.stats(),
+                          "rules": RULES.stats()}
+            elif method == "predict_many":
+                result = await self.batcher.submit(batch, **options)
+            elif method == "predict_batch":
+                result = await loop.run_in_executor(self.executor, partial(self.model.predict_batch, batch, **options))
+            elif method == "predict":
+                result = await loop.run_in_executor(self.executor, partial(self.model.predict, batch[0], **options))
+            elif method == "generate":
+                result = await loop.run_in_executor(self.generator_executor, partial(
+                    self._generate, request.get("texts", []), options["ent_type"]))
+            else:
+                return {"error": f"Unknown method: {method}"}
+        except QueueFullError as e:
+            return {"error": str(e), "queue_full": True}
+        except Exception as e:
+            logger.error(f"Model server failed to process '{method}': {e}")
+            return {"error": str(e)}
+        return {"result": result}
+
+    def _generate(self, values: List[str], ent_type: str) -> list:
+        return self.model.pd_generator.generate_many(values, ent_type)
+
+
+class RemoteGenerator:
+    """
+    `PersonalDataGenerator` of the model server, used by the API workers for the generator strategies,
+    so a value gets the same surrogate in the columns hidden by the model (on the server) and in the
+    generator columns, whichever worker runs the job. The numeric and date columns are generated
+    in the worker (`ArrayGenerator` needs only the secret): with `PD_GENERATOR_SECRET` they get
+    the same surrogates as on the server, without it they are consistent within the worker.
+    """
+
+    def __init__(self, model: "RemoteModel"):
+        self._model = model
+        self._arrays = ArrayGenerator(consistency=True)
+
+    def generate(self, s: str, ent_type: str):
+        return self.generate_many([s], ent_type)[0]
+
+    def generate_many(self, values: List[str], ent_type: str) -> list:
+        return self._model._call("generate", list(values), {"ent_type": ent_type})
+
+    def generate_numbers(self, values):
+        return self._arrays.numbers(values)
+
+    def generate_dates(self, values):
+        return self._arrays.dates(values)
+
+
+class RemoteModel:
+    """
+    Client side of `ModelServer`, a drop-in replacement for `SpacyModel` in the API workers.
+
+    Calls block the calling thread (run them on the inference executor); each thread keeps its
+    own connection to the server. Surrogates for the generator strategies are produced by the
+    server's generator too (`RemoteGenerator`).
+    """
+
+    def __init__(self, socket_path: str = MODEL_SOCKET, timeout: float = MODEL_SERVER_TIMEOUT):
+        self.socket_path = socket_path
+        self._local = threading.local()
+        self.model_name = self._wait_for_server(timeout)["model_name"]
+        self.pd_generator = RemoteGenerator(self)
+        self.is_loaded = True
+
+    def predict(self, payload: DatabaseDataPayload, **options) -> dict:
+        return self._call("predict", [payload.data], options)
+
+    def predict_many(self, batch: List[DatabaseDataPayload], **options) -> List[dict]:
+        return self._call("predict_many", [payload.data for payload in batch], options)
+
+    def predict_batch(self, batch: List[DatabaseDataPayload], **options) -> dict:
+        return self._call("predict_batch", [payload.data for payload in batch], options)
+
+    def stats(self) -> dict:
+        return self._call("stats")
+
+    def ping(self) -> bool:
+        """Whether the model server is up (for the healthcheck)."""
+        try:
+            self._call("info")
+            return True
+        except (OSError, ModelServerError):
+            return False
+
+    def _wait_for_server(self, timeout: float) -> dict:
+        deadline = time.monotonic() + timeout
+        while True:
+            try:
+                return self._call("info")
+            except OSError:
+                if time.monotonic() > deadline:
+                    raise
+                logger.info(f"Waiting for the model server on {self.socket_path}...")
+                time.sleep(1)
+
+    def _call(self, method: str, texts: List[str] = None, options: dict = None):
+        message = _encode({"method": method, "texts": texts or [], "options": options or {}})
+        try:
+            response = self._roundtrip(message)
+        except OSError:
+            self._close()  # server restarted or connection dropped, reconnect once
+            response = self._roundtrip(message)
+
+        if "error" in response:
+            if response.get("queue_full"):
+                raise QueueFullError(response["error"])
+            raise ModelServerError(response["error"])
+        return response["result"]
+
+    def _close(self) -> None:
+        sock = getattr(self._local, "sock", None)
+        if sock is not None:
+            sock.close()
+        self._local.sock = None
+
+    def _roundtrip(self, message: bytes) -> dict:
+        sock = getattr(self._local, "sock", None)
+        if sock is None:
+            sock = socket.socket(socket.AF_UNIX, socket.SOCK_STREAM)
+            try:
+                sock.connect(self.socket_path)
+            except OSError:
+                sock.close()
+                raise
+            self._local.sock = sock
+        sock.sendall(message)
+        (length,) = _HEADER.unpack(_recv_exactly(sock, _HEADER.size))
+        return json.loads(_recv_exactly(sock, length))
+
+
+def main():
+    logger.info("Loading model for the model server.")
+    model = SpacyModel()
+    asyncio.run(ModelServer(model).serve(MODEL_SOCKET))
+
+
+if __name__ == "__main__":
+    main()
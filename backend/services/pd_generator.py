@@ -1,21 +1,157 @@
+import os
+import json
+import random
+import hashlib
+import datetime
+import tempfile
+from functools import lru_cache
+from typing import Dict, Iterable, Optional, Tuple
+
+import mimesis
+import numpy as np
+import pandas as pd
 from mimesis import Person
 from mimesis.locales import Locale
-from mimesis import Datetime
 from mimesis import Generic
 from mimesis.enums import Gender
-import random
+from loguru import logger
+
+PD_GENERATOR_SECRET = os.getenv("PD_GENERATOR_SECRET", "")  # key of the deterministic surrogates, empty - off
+PD_POOL_SIZE = int(os.getenv("PD_POOL_SIZE", 10000))  # surrogates drawn from mimesis per pool
+PD_POOLS_PATH = os.getenv("PD_POOLS_PATH", os.path.join(tempfile.gettempdir(), "pd_pools.json"))
+
+POOLS_VERSION = 1  # bump when the pools are built differently
+FIRST_DATE = datetime.date(2000, 1, 1)  # the date surrogates are the days from it to the end of the current year
+DATE_FORMAT = '%d.%m.%Y'  # as `Datetime.formatted_date` of the RU locale, parsed back by the date generator
+
+Pools = Dict[str, Tuple[str, ...]]
+
+
+def _unique(draw, size: int) -> Tuple[str, ...]:
+    # `size` draws without the repeats, in the order of the first draw (the same for the same seed)
+    return tuple(dict.fromkeys(draw() for _ in range(size)))
+
+
+def build_pools(size: int = PD_POOL_SIZE) -> Pools:
+    """Surrogate pools drawn from mimesis with a fixed seed: the same pools in every process."""
+    person, generic = Person(Locale.RU, seed=0), Generic(Locale.RU, seed=0)
+    last_date = datetime.date(datetime.date.today().year, 12, 31)
+    return {
+        "male": _unique(lambda: person.name(gender=Gender.MALE), size),
+        "female": _unique(lambda: person.name(gender=Gender.FEMALE), size),
+        "date": tuple((FIRST_DATE + datetime.timedelta(days=i)).strftime(DATE_FORMAT)
+                      for i in range((last_date - FIRST_DATE).days + 1)),
+        "email": _unique(person.email, size),
+        "company": _unique(generic.finance.company, size),
+        "city": _unique(generic.address.city, size),
+        "phone": _unique(lambda: generic.person.phone_number(mask='+7(9##)#######'), size),
+        "hostname": _unique(generic.internet.hostname, size),
+        "word": _unique(generic.text.word, size),
+    }
+
+
+@lru_cache(maxsize=None)
+def load_pools(size: int = PD_POOL_SIZE, path: str = PD_POOLS_PATH) -> Pools:
+    """
+    Pools of `build_pools`, cached in a JSON file (rebuilt if it was written by another mimesis version,
+    pool size or date range) and shared by all generators of the process.
+    """
+    header = {"version": POOLS_VERSION, "mimesis": mimesis.__version__, "size": size,
+              "year": datetime.date.today().year}
+    try:
+        with open(path, encoding="utf-8") as f:
+            cached = json.load(f)
+        if cached.get("header") == header:
+            return {name: tuple(pool) for name, pool in cached["pools"].items()}
+    except (OSError, ValueError):
+        pass
+
+    pools = build_pools(size)
+    try:  # written to a temporary file first: the workers may build the pools at the same time
+        with tempfile.NamedTemporaryFile("w", encoding="utf-8", dir=os.path.dirname(path) or ".",
+                                         delete=False) as f:
+            json.dump({"header": header, "pools": pools}, f, ensure_ascii=False)
+        os.replace(f.name, path)
+    except OSError as e:
+        logger.warning(f"Failed to cache the surrogate pools in {path}: {e}")
+    logger.info(f"Surrogate pools built: {({name: len(pool) for name, pool in pools.items()})}")
+    return pools
+
+
+class ArrayGenerator:
+    """
+    Vectorized surrogates for the numeric and date columns, computed on NumPy arrays without a Python object
+    per value. Missing values (NaN, None, NaT) stay missing. With `consistency` a value always gets the same
+    surrogate: the index is the hash of the value (`pd.util.hash_array`) keyed with the `secret`, the same
+    in every process; without a secret the key is random per process.
+    """
+
+    _POWERS = 10.0 ** np.arange(1, 18)  # numbers up to 18 digits, the surrogates fit in int64
+
+    def __init__(self, consistency: bool = False, secret: Optional[str] = PD_GENERATOR_SECRET):
+        self.consistency = consistency
+        self._secret = hashlib.sha256(secret.encode()).digest() if secret else os.urandom(32)
+        self._rng = np.random.default_rng()
+
+    def numbers(self, values) -> pd.arrays.IntegerArray:
+        """Integers with as many digits as the integer part of the values, of the same sign."""
+        numbers = pd.to_numeric(pd.Series(values), errors="coerce").to_numpy(dtype=np.float64, na_value=np.nan)
+        missing = np.isnan(numbers)
+        keys = self._keys(numbers, missing, "SENSITIVE")
+        start = 10 ** np.searchsorted(self._POWERS, np.abs(numbers), side="right")  # 10 ** (digits - 1)
+        # from 1 * 10 ** (digits - 1) to 9 * 10 ** (digits - 1), as `PersonalDataGenerator` does
+        surrogates = start + (keys % (8 * start + 1).astype(np.uint64)).astype(np.int64)
+        surrogates = np.where(numbers < 0, -surrogates, surrogates)
+        return pd.arrays.IntegerArray(surrogates, missing)
+
+    def dates(self, values) -> np.ndarray:
+        """`datetime64[D]` dates from `FIRST_DATE` to the end of the current year."""
+        days = np.asarray(pd.to_datetime(pd.Series(values), errors="coerce"), dtype="datetime64[D]")
+        missing = np.isnat(days)
+        first, last = np.datetime64(FIRST_DATE, "D"), np.datetime64(f"{datetime.date.today().year}-12-31", "D")
+        keys = self._keys(days.view(np.int64), missing, "DATE")
+        surrogates = first + (keys % np.uint64((last - first).astype(np.int64) + 1)).astype("timedelta64[D]")
+        surrogates[missing] = np.datetime64("NaT")
+        return surrogates
+
+    def _keys(self, values: np.ndarray, missing: np.ndarray, ent_type: str) -> np.ndarray:
+        if not self.consistency:
+            return self._rng.integers(np.iinfo(np.uint64).max, size=len(values), dtype=np.uint64, endpoint=True)
+        hash_key = hashlib.blake2b(ent_type.encode(), key=self._secret, digest_size=8).hexdigest()  # 16 chars
+        return pd.util.hash_array(np.where(missing, 0, values), hash_key=hash_key)
 
 
 class PersonalDataGenerator:
-    def __init__(self, consistency: bool = False):
-        self.person = Person(Locale.RU)
-        self.datetime = Datetime(Locale.RU)
-        self.generic = Generic(Locale.RU)
+    """
+    Surrogate values for the hidden entities, drawn by index from the pools of `load_pools` (names by gender,
+    dates, emails, companies, cities, phones...), no mimesis call on the hot path. With `consistency` a value
+    always gets the same surrogate:
+
+    - with a `secret` (keyed mode) the index is a keyed hash of the value and the entity type (BLAKE2b),
+      so the surrogate is the same in every worker, process and job run with the same secret (and pools)
+      and nothing is stored;
+    - without it the surrogates generated so far are remembered in `_internal_data` (per process).
+    """
+
+    def __init__(self, consistency: bool = False, secret: Optional[str] = PD_GENERATOR_SECRET,
+                 pools: Optional[Pools] = None):
+        self.pools = pools if pools is not None else load_pools()
+        self._random = random.Random()
         self._internal_data = {}
         self.consistency = consistency
+        self._secret = hashlib.sha256(secret.encode()).digest() if secret else None  # BLAKE2b keys are <= 64 bytes
+        self._arrays = ArrayGenerator(consistency, secret)
+
+    @property
+    def keyed(self) -> bool:
+        return self.consistency and self._secret is not None
 
     def generate(self, s: str, ent_type: str):
-        if self.consistency:
+        if not self.consistency:
+            return self._generate(ent_type, str(s))
+        if self._secret is not None:
+            return self._generate(ent_type, str(s), self._key(str(s), ent_type))
+        else:
             if self._internal_data.get(s, {}).get(ent_type):
                 return self._internal_data[s][ent_type]
             elif self._internal_data.get(s):
@@ -25,35 +161,55 @@ class PersonalDataGenerator:
                 self._internal_data[s] = {ent_type: self._generate(ent_type, str(s))}
                 return self._internal_data[s][ent_type]
 
-    def _generate(self, ent_type: str, s: str = None):
+    def generate_many(self, values: Iterable[str], ent_type: str) -> list:
+        return [self.generate(value, ent_type) for value in values]
+
+    def generate_numbers(self, values) -> pd.arrays.IntegerArray:
+        return self._arrays.numbers(values)
+
+    def generate_dates(self, values) -> np.ndarray:
+        return self._arrays.dates(values)
+
+    def _key(self, s: str, ent_type: str) -> int:
+        # keyed BLAKE2b is a MAC like HMAC-SHA256, twice as fast
+        digest = hashlib.blake2b(f"{ent_type}\x1f{s}".encode(), key=self._secret, digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    def _generate(self, ent_type: str, s: str = None, key: int = None):
+        """The surrogate number `key` (random if None) of the pool of the entity type."""
+        if key is None:
+            key = self._random.getrandbits(64)
+        pools = self.pools
         if ent_type == 'PER':
-            random_gender = random.choice([Gender.MALE, Gender.FEMALE])
-            return self.person.name(gender=random_gender)
+            pool = pools['male'] if key & 1 else pools['female']
+            return pool[(key >> 1) % len(pool)]
         elif ent_type == 'DATE':
-            return self.datetime.formatted_date()
+            pool = pools['date']
         elif ent_type == 'CONTACTS':
-            return self.person.email()
+            pool = pools['email']
         elif ent_type == 'ORG':
-            return self.generic.finance.company()
+            pool = pools['company']
         elif ent_type == 'LOC':
-            return self.generic.address.city()
+            pool = pools['city']
         elif ent_type == 'SENSITIVE':
-            s = s.strip()
-            start = 1 * (10 ** (len(s) - 1))
-            end = 9 * (10 ** (len(s) - 1))
-            return self.generic.numeric.integer_number(start=start, end=end)
+            # a number with as many digits as the value
+            digits = max(len(s.strip()), 1)
+            start = 1 * (10 ** (digits - 1))
+            end = 9 * (10 ** (digits - 1))
+            return start + key % (end - start + 1)
         elif ent_type == 'EMAIL':
-            return self.generic.person.email()
+            pool = pools['email']
         elif ent_type == 'PHONE':
-            return self.generic.person.phone_number(mask='+7(9##)#######')
+            pool = pools['phone']
         elif ent_type == 'URL':
-            return self.generic.internet.hostname()
+            pool = pools['hostname']
         else:
-            return self.generic.text.word()
+            pool = pools['word']
+        return pool[key % len(pool)]
 
 
 if __name__ == "__main__":
-    pd_gen = PersonalDataGenerator(consistency=True)
+    pd_gen = PersonalDataGenerator(consistency=True, secret="demo")
 
     s1 = "1000000"
     s2 = "PER2"
@@ -69,3 +225,7 @@ if __name__ == "__main__":
     print(f"\n\033[096mGenerating for {s2}...\033[0m")
     for ent in ['PER', 'DATE', 'CONTACTS', 'ORG', 'LOC', 'SENSITIVE']:
         print(pd_gen.generate(s2, ent))
+
+    print(f"\n\033[096mGenerating for a numeric and a date column...\033[0m")
+    print(pd_gen.generate_numbers([1000000, -42, 3.5, None]))
+    print(pd_gen.generate_dates([datetime.date(1990, 5, 17), None]))
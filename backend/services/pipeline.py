@@ -0,0 +1,69 @@
+import os
+from typing import List
+
+import spacy
+from loguru import logger
+
+# Only `doc.ents` is used downstream, NER has its own embedding layer and does not listen to tok2vec
+SPACY_EXCLUDE = [name for name in os.getenv(
+    "SPACY_EXCLUDE", "tok2vec,morphologizer,parser,attribute_ruler,lemmatizer").split(",") if name]
+SPACY_DISABLE = [name for name in os.getenv("SPACY_DISABLE", "").split(",") if name]
+PIPELINE_SELF_CHECK = os.getenv("PIPELINE_SELF_CHECK", "True").lower() in ("true", "1")
+
+# Texts used to compare the reduced pipeline with the full one
+SAMPLE_TEXTS = [
+    "Пациент Иванов Иван Петрович, 1965 г.р., поступил в ГБУЗ ГКБ №1 г. Москвы 12.03.2020.",
+    "Консультирована профессором Смирновой А.В. в клинике Медси, рекомендовано наблюдение у терапевта.",
+    "Адрес: Московская область, г. Подольск, ул. Ленина, д. 5, кв. 12. Тел.: +7 (916) 123-45-67.",
+    "Со слов матери, Петровой Ольги Николаевны, ребенок болен в течение 3 дней.",
+    "Выписан 1 мая 2021 года под наблюдение участкового врача поликлиники №45 ДЗМ.",
+    "Направлен на МРТ в ООО \"Клиника Здоровье\" (Санкт-Петербург), паспорт 4510 123456.",
+]
+
+
+def pipeline_mismatches(nlp, reference, texts: List[str] = None) -> List[str]:
+    """Texts for which `nlp` and `reference` find different entities."""
+    texts = texts or SAMPLE_TEXTS
+    mismatches = []
+    for text, doc, reference_doc in zip(texts, nlp.pipe(texts), reference.pipe(texts)):
+        ents = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
+        reference_ents = [(ent.start_char, ent.end_char, ent.label_) for ent in reference_doc.ents]
+        if ents != reference_ents:
+            mismatches.append(text)
+    return mismatches
+
+
+def load_pipeline(path: str, exclude: List[str] = None, disable: List[str] = None,
+                  self_check: bool = PIPELINE_SELF_CHECK):
+    """
+    Load a spaCy pipeline without the components NER does not need.
+
+    Excluded components are not loaded at all, disabled ones are loaded but not run.
+    With `self_check` the reduced pipeline is compared with the full one on `SAMPLE_TEXTS`;
+    if the entities differ or the reduced pipeline fails (e.g. an excluded `tok2vec` feeds a listener
+    of another component), the full pipeline is used instead.
+    """
+    exclude = SPACY_EXCLUDE if exclude is None else exclude
+    disable = SPACY_DISABLE if disable is None else disable
+    if not (exclude or disable):
+        return spacy.load(path)
+
+    try:
+        nlp = spacy.load(path, exclude=exclude, disable=disable)
+        logger.info(f"Loaded spaCy pipeline {nlp.pipe_names} (excluded: {exclude}, disabled: {disable})")
+        if not self_check:
+            nlp(SAMPLE_TEXTS[0])  # at least check that the reduced pipeline runs
+            return nlp
+        full_nlp = spacy.load(path)
+        mismatches = pipeline_mismatches(nlp, full_nlp)
+    except Exception as e:
+        logger.warning(f"Reduced pipeline (excluded: {exclude}, disabled: {disable}) failed: {e}, "
+                       f"using the full pipeline")
+        return spacy.load(path)
+
+    if mismatches:
+        logger.warning(f"Reduced pipeline finds different entities in {len(mismatches)} sample texts "
+                       f"(e.g. '{mismatches[0]}'), using the full pipeline {full_nlp.pipe_names}")
+        return full_nlp
+    logger.info("Pipeline self-check passed: reduced pipeline finds the same entities as the full one")
+    return nlp
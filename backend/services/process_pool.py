@@ -0,0 +1,82 @@
+import gc
+import os
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor
+from functools import partial
+from typing import List, Optional, Tuple
+
+from loguru import logger
+
+from backend.models.payload import DatabaseDataPayload
+
+INFERENCE_PROCESSES = int(os.getenv("INFERENCE_PROCESSES", 0))  # 0 or 1 - no process pool
+MIN_SLICE_SIZE = int(os.getenv("MIN_SLICE_SIZE", 8))
+
+# Model loaded in the parent process, inherited by the forked workers
+_MODEL = None
+
+
+def _worker_pid(_=None) -> int:
+    return os.getpid()
+
+
+def _detect_slice(batch: List[DatabaseDataPayload], options: dict) -> Tuple[List[str], List[list]]:
+    return _MODEL.detect_batch(batch, **options)
+
+
+class InferencePool:
+    """
+    Process pool for table anonymization jobs.
+
+    Workers are forked right after the model is loaded, so every worker shares the model pages
+    copy-on-write instead of loading its own copy. A chunk of texts is split into contiguous
+    slices, one per worker; each worker detects the entities of its slice (spaCy and rule
+    postprocessing), then the parent merges the slices back in the original row order and hides
+    the entities with its own `pd_generator`, so with `consistency` a value gets the same surrogate
+    whichever slice it lands in (with `PD_GENERATOR_SECRET`, in any process). The hiding runs on
+    `executor` (the inference executor of the app), not on the event loop.
+    """
+
+    def __init__(self, model, processes: int = INFERENCE_PROCESSES, min_slice_size: int = MIN_SLICE_SIZE,
+                 executor: Optional[Executor] = None):
+        global _MODEL
+        _MODEL = model
+        self.model = model
+        self.executor = executor
+        self.processes = processes
+        self.min_slice_size = min_slice_size
+
+        # Keep already loaded objects out of the GC, so collections in workers do not touch shared pages
+        gc.freeze()
+        self._executor = ProcessPoolExecutor(max_workers=processes, mp_context=multiprocessing.get_context("fork"))
+        pids = set(self._executor.map(_worker_pid, range(processes)))  # fork all workers now
+        logger.info(f"Inference process pool started: {len(pids)} workers")
+
+    async def predict_batch(self, batch: List[DatabaseDataPayload], **options) -> dict:
+        """Same result as `SpacyModel.predict_batch`, computed by the worker processes."""
+        loop = asyncio.get_running_loop()
+        results = await asyncio.gather(*[
+            loop.run_in_executor(self._executor, partial(_detect_slice, batch_slice, options))
+            for batch_slice in self._split(batch)
+        ])
+
+        texts, detected = [], []
+        for slice_texts, slice_detected in results:
+            texts += slice_texts
+            detected += slice_detected
+        return await loop.run_in_executor(self.executor, partial(self.model.hide_batch, texts, detected, **options))
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=False, cancel_futures=True)
+        gc.unfreeze()
+
+    def _split(self, batch: list) -> List[list]:
+        n_slices = max(1, min(self.processes, len(batch) // self.min_slice_size))
+        size, rest = divmod(len(batch), n_slices)
+        slices, start = [], 0
+        for i in range(n_slices):
+            end = start + size + (1 if i < rest else 0)
+            slices.append(batch[start:end])
+            start = end
+        return slices
@@ -1,14 +1,11 @@
 import os.path
-from typing import List, Union
+from typing import Collection, List, Union
 from loguru import logger
 
-from .contacts.rules_contacts import find_contacts
-from .other.rules_other import find_sensitive
-from .dates.rules_dates import find_dates
-from .per.rules_names import find_names
+from .rules import RULES
+from .spans import select_spans
 # from .per.base_nlp import find_names_base
-from .org.rules_org import find_orgs
-from .loc.rules_loc import find_locations
+from .match_dict import NamesMatcher, compile_names_matcher, find_names_with_matcher
 
 
 PER_LIST = []
@@ -57,34 +54,31 @@ def print_entities(ents_dict):
 def _add_entities(entities, doc, alignment_mode="expand"):
     """
     Add entities to spacy doc
-    :param entities: sorted list of entities in format (start, end, label)
-    :param doc: spacy doc to add entities to
+    :param entities: list of entities in format (start, end, label)
+    :param doc: spacy doc to add entities to (its own entities are kept)
     :param alignment_mode: mode to align entities with tokens: strict, expand, contract
     :return: spacy doc with added entities
+
+    Overlaps are resolved on the aligned token spans by `spans.select_spans` (the earlier entity wins,
+    at the same start the label priority of `spans.LABEL_PRIORITY`), in O(n log n).
     """
     existing_entities = list(doc.ents)
-    new_entities = []
-
-    # Function to check if a span overlaps with any in a given list
-    def is_overlapping(span, spans):
-        return any(span.start < e.end and span.end > e.start for e in spans)
-
-    for start, end, label in sorted(entities, key=lambda x: x[0]):
+    candidates = []
+    for start, end, label in entities:
         span = doc.char_span(start, end, label=label, alignment_mode=alignment_mode)
         if span is None:
-            logger.info(f"Skipping misaligned entity: {label} - {doc.text[start:end]}")
-            continue
-
-        if is_overlapping(span, existing_entities) or is_overlapping(span, new_entities):
-            logger.info(f"Skipping overlapping entity: {label} - {doc.text[start:end]}")
+            logger.debug(f"Skipping misaligned entity: {label} - {doc.text[start:end]}")
             continue
+        candidates.append((span.start, span.end, label, span))
 
-        new_entities.append(span)
+    kept, dropped = select_spans(candidates, fixed=[(ent.start, ent.end) for ent in existing_entities])
+    for _, _, label, span in dropped:
+        logger.debug(f"Skipping overlapping entity: {label} - {span.text}")
+    new_entities = [span for _, _, _, span in kept]
 
-    # Combine existing and new entities, remove duplicates and sort
     try:
-        doc.ents = sorted(set(existing_entities + new_entities), key=lambda x: x.start_char)
-        logger.info(f"\033[090mAdded entities: {doc.ents}\033[0m")
+        doc.ents = sorted(existing_entities + new_entities, key=lambda x: x.start_char)
+        logger.debug(f"Added entities: {new_entities}")
     except Exception as e:
         logger.error(f"\033[091mError adding entities: {e}\033[0m: {doc.ents} | {new_entities}")
     return doc
@@ -93,10 +87,13 @@ def _add_entities(entities, doc, alignment_mode="expand"):
 def add_custom_entities_to_doc(doc,
                                base_doc=None,
                                verbose: bool = False,
-                               checklist: Union[None, List[str], str] = None,
+                               checklist: Union[None, List[str], NamesMatcher] = None,
                                filters: Union[None, List[str]] = None,
                                fuzzy_match: bool = False,
-                               per_list_label: bool = False, ):
+                               per_list_label: bool = False,
+                               labels: Union[None, Collection[str]] = None,
+                               rules_enabled: Union[None, Collection[str]] = None,
+                               rules_disabled: Union[None, Collection[str]] = None, ):
     """
     Add custom entities to spacy doc
 
@@ -104,10 +101,13 @@ def add_custom_entities_to_doc(doc,
         doc (spacy.tokens.doc.Doc): spacy doc to add entities to
         base_doc (spacy.tokens.doc.Doc): spacy doc to use entities from
         verbose (bool): whether to print entities found
-        checklist (list): list of names to add as entities
+        checklist (list): list of names (or a matcher compiled from it) to add as entities
         filters (list): list of filters to apply to entities
         fuzzy_match (bool): whether to use fuzzy matching
         per_list_label (bool): whether to use PER_LIST for entities from checklist
+        labels (list): run only the rules producing these labels (all rules if None)
+        rules_enabled (list): names of rule families to run even if their label is not in `labels`
+        rules_disabled (list): names of rule families not to run
 
     Returns:
         spacy.tokens.doc.Doc: spacy doc with added entities
@@ -117,31 +117,39 @@ def add_custom_entities_to_doc(doc,
     _print_ents_from_doc(doc) if verbose else None
     print("-" * 100) if verbose else None
 
-    sensitive_entities = find_sensitive(text)
-    contacts_entities = find_contacts(text)
-    date_entities = find_dates(text)
-    org_entities = find_orgs(text)
-    loc_entities = find_locations(text)
-
-    name_entities = find_names(text, filter_list=filters)
+    found = RULES.scan(text, labels, enabled=rules_enabled, disabled=rules_disabled, filters=filters)
+    name_entities = found.get('names', [])
     _print_ents_to_file(name_entities, text, 'NAME', file_path='/code/logs/ents.txt')
+    wanted_per = labels is None or 'PER' in labels
+    checklist_entities = find_checklist_names(text, checklist, per_list_label) if wanted_per else []
 
     if verbose:
-        _print_ents(date_entities, text, 'DATE')
-        _print_ents(contacts_entities, text, 'CONTACTS')
-        _print_ents(name_entities, text, 'NAME')
-        _print_ents(org_entities, text, 'ORG')
-        _print_ents(loc_entities, text, 'LOC')
-        _print_ents(sensitive_entities, text, 'SENSITIVE')
+        for family in RULES.families:
+            _print_ents(found.get(family.name, []), text, family.name.upper())
+        _print_ents(checklist_entities, text, 'CHECKLIST')
 
-    # checklist = prepare_names_list()
-    # name_entities += find_names_from_list(text, checklist, label=list_label)
-
-    _print_ents(name_entities, text, 'NAME') if verbose else None
     print("-" * 100) if verbose else None
 
-    entities = [(ent.start_char, ent.end_char, ent.label_) for ent in doc.ents]
-    entities += contacts_entities + date_entities + name_entities + org_entities + loc_entities + sensitive_entities
+    entities = checklist_entities + [ent for ents in found.values() for ent in ents]
     doc = _add_entities(entities, doc)
 
     return doc
+
+
+def find_checklist_names(text, checklist=None, per_list_label=False):
+    """
+    Find names from a checklist (list of names or a matcher compiled from it),
+    labeled as PER_LIST with `per_list_label` and as PER otherwise
+    """
+    if not checklist:
+        return []
+    if not isinstance(checklist, NamesMatcher):
+        checklist = compile_names_matcher(checklist)
+    return find_names_with_matcher(text, checklist, label='PER_LIST' if per_list_label else 'PER')
+
+
+def add_checklist_entities_to_doc(doc, checklist=None, per_list_label=False):
+    """
+    Add names from a checklist to spacy doc (without the other rules)
+    """
+    return _add_entities(find_checklist_names(doc.text, checklist, per_list_label), doc)
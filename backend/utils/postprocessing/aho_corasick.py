@@ -0,0 +1,65 @@
+from collections import deque
+from typing import Iterable, Iterator, Tuple
+
+try:  # C implementation (pyahocorasick), the pure Python automaton below is used without it
+    import ahocorasick
+except ImportError:
+    ahocorasick = None
+
+
+class Automaton:
+    """
+    Pure Python Aho-Corasick automaton with the subset of the `ahocorasick.Automaton` interface used here:
+    `add_word(key, value)`, `make_automaton()` and `iter(text)` yielding `(end_index, value)` for every
+    occurrence of every key (`end_index` is the index of the last character of the occurrence).
+    """
+
+    def __init__(self):
+        self._goto = [{}]
+        self._fail = [0]
+        self._out = [()]
+
+    def add_word(self, key: str, value) -> None:
+        node = 0
+        for char in key:
+            child = self._goto[node].get(char)
+            if child is None:
+                child = len(self._goto)
+                self._goto.append({})
+                self._fail.append(0)
+                self._out.append(())
+                self._goto[node][char] = child
+            node = child
+        self._out[node] = (value,)
+
+    def make_automaton(self) -> None:
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, child in self._goto[node].items():
+                queue.append(child)
+                fail = self._fail[node]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+                self._fail[child] = fail if fail != child else 0
+                self._out[child] += self._out[self._fail[child]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, object]]:
+        goto, fail, out = self._goto, self._fail, self._out
+        node = 0
+        for i, char in enumerate(text):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            for value in out[node]:
+                yield i, value
+
+
+def build_automaton(keys: Iterable[str]):
+    """Automaton over `keys` (each key is also its value), the C implementation when installed."""
+    automaton = ahocorasick.Automaton() if ahocorasick is not None else Automaton()
+    for key in keys:
+        automaton.add_word(key, key)
+    automaton.make_automaton()
+    return automaton
@@ -1,4 +1,33 @@
-import re
+from ..rule_engine import RunAlternatives, compile_guarded
+
+EMAIL_CHARS = r'[A-Za-zА-Яа-яЁё0-9!#$%&\'*+/=?^_`{|}~.-]'
+
+# (pattern, character class of the run the pattern starts with)
+CONTACTS_ALTERNATIVES = [
+    # email
+    (r'[A-Za-z0-9._%+-]*@[A-Za-z0-9.-]*\.[A-Z|a-z]{2,7}', r'[A-Za-z0-9._%+-]'),
+    (r'[А-Яа-яЁё]*@\w+', r'[А-Яа-яЁё]'),
+    # phone
+    (r'8-\d{3}-\d{3}-\d{2}-\d{2}(\.|)', None),
+    (r'(?<=\D)(\+7|8)?(\()?(\d{3,4})(\))?[\s-]?(\d{2,3})[\s-]?(\d{2})[\s-]?(\d{2})', None),
+    (EMAIL_CHARS + r'+@[A-Za-z0-9!#$%&\'*+/=?^_`{|}~.-]+', EMAIL_CHARS),
+    # foreign phone and email
+    (r'\b(\+?\d{1,4}[\s-]?)?(\()?(\d{1,4})(\))?[\s-]?(\d{2,4})[\s-]?(\d{2,4})[\s-]?(\d{2,4})\b', None),
+    (EMAIL_CHARS + r'+@[A-Za-z0-9!#$%&\'*+/=?^_`{|}~.-]+', EMAIL_CHARS),  # email
+]
+
+PATTERN_PHONE_WITH_EXTENSION = (
+    r'\b(\+?\d{1,4}[\s-]?)?(\()?(\d{1,4})(\))?[\s-]?(\d{2,4})[\s-]?(\d{2,4})[\s-]?(\d{2,4})'
+    r'(\s*,\s*(доб\.|#?ext\.|внутренний номер)\s*(\d{1,5}))?\b'
+)
+
+# A text without '@' or two digits in a row has no contacts (every phone pattern has a group of 2+ digits)
+PREFILTER_CONTACTS = r'@|\d\d'
+PREFILTER_PHONES = r'\d\d'
+
+CONTACTS = RunAlternatives(CONTACTS_ALTERNATIVES, r'[A-Za-zА-Яа-яЁё\d!#$%&\'*+/=?^_`{|}~.@(-]')
+PATTERN_CONTACTS = CONTACTS.pattern
+PHONE_WITH_EXTENSION = compile_guarded(PATTERN_PHONE_WITH_EXTENSION, r'[\d+(]', re2_safe=True)
 
 
 def find_contacts(text):
@@ -8,26 +37,10 @@ def find_contacts(text):
 
 
 def find_contacts_with_pattern(text, label='CONTACTS'):
-    pattern = (
-        # email
-        r'[A-Za-z0-9._%+-]*@[A-Za-z0-9.-]*\.[A-Z|a-z]{2,7}|'
-        r'[А-Яа-яЁё]*@\w+|'
-        # phone
-        r'8-\d{3}-\d{3}-\d{2}-\d{2}(\.|)|'
-        r'(?<=\D)(\+7|8)?(\()?(\d{3,4})(\))?[\s-]?(\d{2,3})[\s-]?(\d{2})[\s-]?(\d{2})|'
-        r'[A-Za-zА-Яа-яЁё0-9!#$%&\'*+/=?^_`{|}~.-]+@[A-Za-z0-9!#$%&\'*+/=?^_`{|}~.-]+|'
-        # foreign phone and email
-        r'\b(\+?\d{1,4}[\s-]?)?(\()?(\d{1,4})(\))?[\s-]?(\d{2,4})[\s-]?(\d{2,4})[\s-]?(\d{2,4})\b|'
-        r'[A-Za-zА-Яа-яЁё0-9!#$%&\'*+/=?^_`{|}~.-]+@[A-Za-z0-9!#$%&\'*+/=?^_`{|}~.-]+'  # email
-    )
-    ents = [(m.start(0), m.end(0), label) for m in re.finditer(pattern, text)]
+    ents = [(m.start(0), m.end(0), label) for m in CONTACTS.finditer(text)]
     return ents
 
 
 def find_phone_with_extension(text, label='PHONE_WITH_EXTENSION'):
-    pattern = (
-        r'\b(\+?\d{1,4}[\s-]?)?(\()?(\d{1,4})(\))?[\s-]?(\d{2,4})[\s-]?(\d{2,4})[\s-]?(\d{2,4})'
-        r'(\s*,\s*(доб\.|#?ext\.|внутренний номер)\s*(\d{1,5}))?\b'
-    )
-    ents = [(m.start(0), m.end(0), label) for m in re.finditer(pattern, text)]
+    ents = [(m.start(0), m.end(0), label) for m in PHONE_WITH_EXTENSION.finditer(text)]
     return ents
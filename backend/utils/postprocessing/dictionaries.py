@@ -0,0 +1,93 @@
+import os
+import time
+import threading
+from typing import Dict, Iterable, List, Tuple
+
+from loguru import logger
+
+from .match_dict import compile_names_matcher, enrich_list_from_text_file, find_names_with_matcher
+
+DICTIONARY_RELOAD_INTERVAL = float(os.getenv("DICTIONARY_RELOAD_INTERVAL", 5))  # seconds, 0 - never reload
+
+
+class _Dictionary:
+    def __init__(self, files: List[str], entries: List[str]):
+        self.files = files
+        self.entries = entries
+        self.mtimes = None
+        self.matcher = None
+        self.size = 0
+        self.checked_at = 0.0
+
+
+class DictionaryService:
+    """
+    Dictionaries from `backend/pd/*.txt` files compiled into matchers once and shared by all requests.
+
+    Every `reload_interval` seconds the modification times of the files are checked; a changed dictionary
+    is rebuilt by the request that noticed the change and then swapped in, concurrent requests keep using
+    the previous matcher until the new one is ready.
+    """
+
+    def __init__(self, reload_interval: float = DICTIONARY_RELOAD_INTERVAL):
+        self.reload_interval = reload_interval
+        self._dictionaries: Dict[str, _Dictionary] = {}
+        self._lock = threading.Lock()
+        self._version = 0
+
+    def register(self, name: str, files: Iterable[str] = (), entries: Iterable[str] = ()) -> None:
+        """Add a dictionary built from text files (one entry per line) and static entries."""
+        self._dictionaries[name] = _Dictionary(list(files), list(entries))
+
+    def find(self, name: str, text: str, label: str) -> List[Tuple[int, int, str]]:
+        """Entities `(start, end, label)` for the entries of the dictionary found in the text."""
+        return find_names_with_matcher(text, self.matcher(name), label)
+
+    def matcher(self, name: str):
+        dictionary = self._dictionaries[name]
+        now = time.monotonic()
+        if dictionary.mtimes is None or (self.reload_interval and now - dictionary.checked_at > self.reload_interval):
+            dictionary.checked_at = now
+            if self._mtimes(dictionary) != dictionary.mtimes:
+                self._load(name, dictionary)
+        return dictionary.matcher
+
+    def version(self) -> int:
+        """
+        Number of dictionary (re)loads so far, after checking all dictionaries for changes.
+        Part of the cache keys of detection results, so results found with a replaced dictionary are not reused.
+        """
+        for name in self._dictionaries:
+            self.matcher(name)
+        return self._version
+
+    def stats(self) -> dict:
+        return {name: {"entries": dictionary.size, "files": dictionary.files}
+                for name, dictionary in self._dictionaries.items()}
+
+    @staticmethod
+    def _mtimes(dictionary: _Dictionary) -> Tuple:
+        return tuple(os.path.getmtime(file) if os.path.exists(file) else None for file in dictionary.files)
+
+    def _load(self, name: str, dictionary: _Dictionary) -> None:
+        with self._lock:
+            mtimes = self._mtimes(dictionary)
+            if mtimes == dictionary.mtimes:  # already reloaded by another thread
+                return
+            entries = list(dictionary.entries)
+            for file, mtime in zip(dictionary.files, mtimes):
+                if mtime is None:
+                    logger.error(f"\033[091mFile not found: {file}\033[0m")
+                    continue
+                try:
+                    entries = enrich_list_from_text_file(entries, file)
+                except Exception as e:
+                    logger.error(f"\033[091mError loading dictionary file {file}: {e}\033[0m")
+            matcher = compile_names_matcher(entries)
+            dictionary.matcher, dictionary.size = matcher, len(set(entries))  # swap
+            dictionary.mtimes = mtimes
+            self._version += 1
+        logger.info(f"Loaded dictionary {name}: {dictionary.size} entries")
+
+
+DICTIONARIES = DictionaryService()
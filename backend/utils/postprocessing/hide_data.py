@@ -1,14 +1,64 @@
-def hide_ents(text, entities, placeholder=None, ents_to_hide=None, pd_generator=None):
-    # ent.start_char, ent.end_char, ent.label_
-    for ent in reversed(entities):
+from bisect import bisect_right
+from typing import Iterable, List, Tuple
+
+# (start, end) of a replaced span in the original text -> (start, end) of its replacement in the hidden text
+Offset = Tuple[int, int, int, int]
+
+
+def rewrite_spans(text: str, replacements: Iterable[Tuple[int, int, str]]) -> Tuple[str, List[Offset]]:
+    """
+    Replace `(start, end, replacement)` spans (sorted by start, overlapping ones are skipped) in one pass:
+    the parts of the text are joined once, instead of rebuilding the whole text for every span.
+    Returns the new text and the offset map of the replaced spans.
+    """
+    parts, offsets = [], []
+    position = shift = 0  # end of the last replaced span, length difference of the texts so far
+    for start, end, replacement in replacements:
+        if start < position:
+            continue
+        parts.append(text[position:start])
+        parts.append(replacement)
+        offsets.append((start, end, start + shift, start + shift + len(replacement)))
+        shift += len(replacement) - (end - start)
+        position = end
+    parts.append(text[position:])
+    return "".join(parts), offsets
+
+
+def map_offset(offsets: List[Offset], position: int) -> int:
+    """
+    Position in the hidden text of a position in the original text. A position inside a replaced span
+    maps to the start of its replacement, a position at its end to the end of the replacement.
+    """
+    i = bisect_right(offsets, (position, float("inf"))) - 1  # the last span starting at or before the position
+    if i < 0:
+        return position
+    start, end, new_start, new_end = offsets[i]
+    return new_end + position - end if position >= end else new_start
+
+
+def hide_ents_with_offsets(text, entities, placeholder=None, ents_to_hide=None,
+                           pd_generator=None) -> Tuple[str, List[Offset]]:
+    """
+    Replace the entities (`start_char`, `end_char`, `label_`, `text`) of the `ents_to_hide` labels (all if None)
+    with the placeholder, `[LABEL]` or a value of the generator. Returns the hidden text and the offset map
+    to find the entities in it (`map_offset`) without detecting them again.
+    """
+    replacements = []
+    for ent in sorted(entities, key=lambda ent: ent.start_char):
         if ents_to_hide is not None and ent.label_ not in ents_to_hide:
             continue
         replacement = placeholder if placeholder is not None else f"[{ent.label_}]"
         if pd_generator is not None:
-            replacement = pd_generator.generate(ent.text, ent.label_)
-        text = text[:ent.start_char] + replacement + text[ent.end_char:]
-    return text
+            replacement = str(pd_generator.generate(ent.text, ent.label_))  # SENSITIVE surrogates are numbers
+        replacements.append((ent.start_char, ent.end_char, replacement))
+    return rewrite_spans(text, replacements)
+
+
+def hide_ents(text, entities, placeholder=None, ents_to_hide=None, pd_generator=None):
+    return hide_ents_with_offsets(text, entities, placeholder=placeholder, ents_to_hide=ents_to_hide,
+                                  pd_generator=pd_generator)[0]
 
 
 def hide_ents_in_doc(doc, placeholder=None, ents_to_hide=None, pd_generator=None):
-    return hide_ents(doc.text, doc.ents, placeholder=placeholder, ents_to_hide=ents_to_hide, pd_generator=pd_generator)
\ No newline at end of file
+    return hide_ents(doc.text, doc.ents, placeholder=placeholder, ents_to_hide=ents_to_hide, pd_generator=pd_generator)
@@ -1,5 +1,6 @@
-import re
-from ..match_dict import find_names_from_list
+from ..dictionaries import DICTIONARIES
+from ..rule_engine import compile_guarded
+from ..per.patterns.default_list import LOC_FILES_PATHS
 
 LOC_LIST = [
     "Москва",
@@ -35,19 +36,28 @@ LOC_LIST = [
     "Новосибирская",
 ]
 
+DICTIONARIES.register('LOC', files=LOC_FILES_PATHS, entries=LOC_LIST)
+
+# An adjective followed by 'край' / 'область' in any case. The adjective ending is matched right after `\w+`,
+# so the regex backtracks once per word instead of once per alternative.
+PATTERN_REGIONS = (
+    r'\b\w+(?:ого|ому|ым|ом|ая|ой|ую)\s+кра[еёюи]\b|'
+    r'\b\w+(?:ой|ая|ую)\s+област[иью]\b'
+)
+
+PREFILTER_REGIONS = r'кра|област'
+
+REGIONS = compile_guarded(PATTERN_REGIONS, r'\w')
+
 
 def find_locations(text):
-    loc_entities = find_names_from_list(text, LOC_LIST, label='LOC')
+    loc_entities = DICTIONARIES.find('LOC', text, label='LOC')
     loc_entities += find_regions(text)
     return loc_entities
 
 
 def find_regions(text):
-    pattern = (
-        r'\b(\w+ого|\w+ому|\w+ым|\w+ом|\w+ая|\w+ой|\w+ую)\s+кра[еёюи]\b|'
-        r'\b(\w+ой|\w+ая|\w+ую|\w+ой)\s+област[иью]\b'
-    )
-    ents = [(m.start(0), m.end(0), 'LOC') for m in re.finditer(pattern, text)]
+    ents = [(m.start(0), m.end(0), 'LOC') for m in REGIONS.finditer(text)]
     return ents
 
 # TODO: refactor this code to use the same approach as in rules_per.py, rules_org.py
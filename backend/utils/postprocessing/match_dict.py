@@ -1,14 +1,18 @@
 import re
 
+from .aho_corasick import build_automaton
 
-def find_names_from_list(text,
-                         match_list,
-                         label='SENSITIVE',
-                         case_sensitive=False,
-                         space_before=True,
-                         space_after=True):
-    named_entities = []
 
+def _is_word_char(text, i):
+    # same characters as `\w` in `re`
+    return 0 <= i < len(text) and (text[i].isalnum() or text[i] == '_')
+
+
+def _is_boundary(text, i):
+    return _is_word_char(text, i - 1) != _is_word_char(text, i)
+
+
+def _case_variants(match_list, case_sensitive=False):
     # Prepare the match list
     match_list = set(match_list)
     if not case_sensitive:
@@ -17,21 +21,92 @@ def find_names_from_list(text,
         modified_match_list.update(name.capitalize() for name in match_list)
         modified_match_list.update(set(match_list))
         match_list = set(modified_match_list)
+    return match_list
+
+
+class NamesMatcher:
+    """
+    Dictionary matcher with the semantics of the regex `\b(name1|name2|...)\b` (longest names first),
+    implemented with an Aho-Corasick automaton: one linear scan of the text for any number of names.
+
+    All occurrences of all names (and their case variants) are found, the ones violating the word
+    boundaries are dropped, then, as the regex does, the longest match at the leftmost position wins
+    and the scan continues after it.
+    """
+
+    def __init__(self, names, space_before=True, space_after=True):
+        self.size = len(names)
+        self.space_before = space_before
+        self.space_after = space_after
+        self._automaton = build_automaton(names)
+
+    def finditer(self, text):
+        """`(start, end)` of the non-overlapping matches, left to right."""
+        longest = {}  # start -> end of the longest match
+        for last, name in self._automaton.iter(text):
+            start, end = last - len(name) + 1, last + 1
+            if _is_boundary(text, start) != self.space_before or _is_boundary(text, end) != self.space_after:
+                continue
+            if end > longest.get(start, start):
+                longest[start] = end
+
+        position = 0
+        for start in sorted(longest):
+            if start >= position:
+                yield start, longest[start]
+                position = longest[start]
+
+
+def find_names_from_list(text,
+                         match_list,
+                         label='SENSITIVE',
+                         case_sensitive=False,
+                         space_before=True,
+                         space_after=True):
+    matcher = compile_names_matcher(match_list, case_sensitive, space_before, space_after)
+    return find_names_with_matcher(text, matcher, label)
+
+
+def find_names_with_matcher(text, matcher, label='SENSITIVE'):
+    """Entities for the matches of a matcher built by `compile_names_matcher` (None matches nothing)."""
+    if matcher is None:
+        return []
+    return [(start, end, label) for start, end in matcher.finditer(text)]
+
+
+def compile_names_matcher(match_list,
+                          case_sensitive=False,
+                          space_before=True,
+                          space_after=True):
+    """Compile a list of names into a `NamesMatcher`, None for an empty list."""
+    match_list = _case_variants(match_list, case_sensitive)
+
+    match_list.discard('')
+    if not match_list:
+        return None
+    return NamesMatcher(match_list, space_before=space_before, space_after=space_after)
+
+
+def compile_names_regex(match_list,
+                        case_sensitive=False,
+                        space_before=True,
+                        space_after=True):
+    """Previous implementation of the matcher as one regex alternation (kept for benchmarks)."""
+    match_list = _case_variants(match_list, case_sensitive)
 
     # Prepare regex components
     prefix = r'\b' if space_before else r'\B'
     suffix = r'\b' if space_after else r'\B'
 
     # Combine regex patterns to minimize regex compilations
+    match_list.discard('')
+    if not match_list:
+        return None
+    # longest names first, so the longest match wins at the same position
+    match_list = sorted(match_list, key=len, reverse=True)
     combined_regex_pattern = '|'.join([re.escape(org_name) for org_name in match_list])
     full_regex_pattern = prefix + '(' + combined_regex_pattern + ')' + suffix
-
-    # Perform regex search
-    for match in re.finditer(full_regex_pattern, text):
-        start, end = match.span()
-        named_entities.append((start, end, label))
-
-    return named_entities
+    return re.compile(full_regex_pattern)
 
 
 def enrich_list_from_text_file(raw_list, file_path, min_word_lenght=3):
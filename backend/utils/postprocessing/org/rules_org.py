@@ -1,17 +1,18 @@
 import re
 
 from ..match_dict import find_names_from_list
-from ..load_lists import prepare_names_list
+from ..dictionaries import DICTIONARIES
 from ..per.patterns.default_list import ORG_FILES_PATHS
 
+DICTIONARIES.register('ORG', files=ORG_FILES_PATHS)
+
 
 def find_orgs(text, org_list=None):
-    org_list = org_list or []
-    # Prepare org names list to check against
-    org_list = prepare_names_list(org_list, ORG_FILES_PATHS)
-    # Add entities from list if found in text
+    # Add entities from the org dictionary (and the extra list) if found in text
     orgs = find_orgs_with_pattern(text)
-    orgs += find_names_from_list(text, org_list, label='ORG')
+    orgs += DICTIONARIES.find('ORG', text, label='ORG')
+    if org_list:
+        orgs += find_names_from_list(text, org_list, label='ORG')
     return orgs
 
 
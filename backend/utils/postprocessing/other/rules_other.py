@@ -1,4 +1,14 @@
-import re
+from ..rule_engine import compile_guarded
+
+PATTERN_IDS = r'\b\d{4}[-\s/]?\d{6}\b'
+# Latin letters and runs of 4+ digits: the same words as `\b(?:[a-zA-Z]*\d{4,}[a-zA-Z]*)+\b`, but a word has only
+# one way to be split, so a long number followed by a Cyrillic letter doesn't backtrack exponentially
+PATTERN_SEQUENCES_WITH_DIGITS = r'\b[a-zA-Z]*\d{4,}(?:[a-zA-Z]+\d{4,})*[a-zA-Z]*\b'
+
+PREFILTER_SENSITIVE = r'\d{4}'  # both patterns need 4 digits in a row
+
+IDS = compile_guarded(PATTERN_IDS, r'\d', re2_safe=True)
+SEQUENCES_WITH_DIGITS = compile_guarded(PATTERN_SEQUENCES_WITH_DIGITS, r'[a-zA-Z\d]', re2_safe=True)
 
 
 def find_sensitive(text):
@@ -8,12 +18,10 @@ def find_sensitive(text):
 
 
 def find_ids(text: str, label: str = 'ID'):
-    pattern = r'\b\d{4}[-\s/]?\d{6}\b'
-    ents = [(m.start(), m.end(), label) for m in re.finditer(pattern, text)]
+    ents = [(m.start(), m.end(), label) for m in IDS.finditer(text)]
     return ents
 
 
 def find_sequences_with_digits(text: str, label: str = 'SEQUENCE_WITH_DIGITS'):
-    pattern = r'\b(?:[a-zA-Z]*\d{4,}[a-zA-Z]*)+\b'
-    ents = [(m.start(0), m.end(0), label) for m in re.finditer(pattern, text)]
-    return ents
\ No newline at end of file
+    ents = [(m.start(0), m.end(0), label) for m in SEQUENCES_WITH_DIGITS.finditer(text)]
+    return ents
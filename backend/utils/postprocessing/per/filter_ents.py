@@ -1,4 +1,7 @@
 import re
+from functools import lru_cache
+
+from loguru import logger
 
 
 def filter_ents_by_pattern(text, name_entities, patterns_to_filter):
@@ -13,16 +16,25 @@ def filter_ents_by_pattern(text, name_entities, patterns_to_filter):
     return filtered_entities
 
 
+@lru_cache(maxsize=32)
+def _compile_name_roots(roots):
+    # a word starting with any of the roots (the ending does not matter for the search)
+    return re.compile(r'\b(?:' + '|'.join(re.escape(root) for root in roots) + r')')
+
+
 def filter_ents_by_names_list(text, name_entities, list_of_name_roots):
+    """
+    Drop entities containing a word that starts with one of the roots,
+    the roots are compiled into one pattern once per list
+    """
+    if not list_of_name_roots:
+        return list(name_entities)
+    pattern = _compile_name_roots(tuple(list_of_name_roots))
     filtered_entities = []
     for start, end, label in name_entities:
-        overlaps = False
-        for root in list_of_name_roots:
-            root_regex = re.escape(root)
-            if re.search(r'\b' + root_regex + r'[а-яА-ЯёЁ]*', text[start:end]):
-                print(f"\033[091m{label}\033[090m: | {text[start:end]} | is filtered by {root_regex}\033[0m")
-                overlaps = True
-                break
-        if not overlaps:
-            filtered_entities.append((start, end, label))
+        match = pattern.search(text[start:end])
+        if match:
+            logger.debug("{} | {} | is filtered by {}", label, text[start:end], match.group())
+            continue
+        filtered_entities.append((start, end, label))
     return filtered_entities
@@ -14,7 +14,7 @@ PATTERN_1 = (
     r'пап[аыой]|мам[аыой]|сестр[аыой]|нян[иеяей]|'
     r'сын[ау]|дочери|супруги|невестке|'
     r'с\s(?:сыном|отцом|сопровождающим\sлицом|дочерьми)'
-    r')\s+(?!.*\r?\n.*)([A-ZА-ЯЁ][a-zA-Zа-яА-ЯёЁ]*),?\b'
+    r')[^\S\n]+([A-ZА-ЯЁ][a-zA-Zа-яА-ЯёЁ]*),?\b'  # the name on the same line
 )
 
 # Шаблон для выделения имен после слов, оканчивающихся на 'олога',
@@ -22,7 +22,7 @@ PATTERN_1 = (
 # захватывает имена, заключенные в скобках после этих слов
 PATTERN_2 = (
     r'\b[а-яА-ЯёЁ]+(?:олога|ологу|олог|ологом)\s+\((\w+)\)|'  # PATTERN_1
-    r'\b(?:[а-яё]+(?:олога|ологу|олог|ологом))\s+(?!.*\r?\n.*)([А-ЯЁ][а-яё]+)'  # PATTERN_2
+    r'\b(?:[а-яё]+(?:олога|ологу|олог|ологом))[^\S\n]+([А-ЯЁ][а-яё]+)'  # PATTERN_2, on the same line
 )
 
 # Шаблон для выделения имен после ключевых слов, указывающими на сопровождающие отношения
@@ -1,44 +1,58 @@
 import re
 from typing import List, Union
 from .patterns.general import PATTERN_GENERAL, PATTERN_GENERAL_LATIN
+from .patterns.specific import PATTERN_1, PATTERN_2, PATTERN_3, PATTERN_5, PATTERN_6
 from .patterns.filters import FILTER_LIST
 from .filter_ents import filter_ents_by_pattern, filter_ents_by_names_list
+from ..rule_engine import KeywordTriggers, TriggeredPattern, compile_guarded
+from ..spans import merge_spans
 
+# Select words that start with a capital letter
+PATTERN_PARENTHESES = r'\(\s*[А-ЯЁ][а-яё]+\s*\)|'  # Format like '( Иванов )'
+PATTERN_PARENTHESES += r'\(\s*[A-Z][a-z]+\s*\)'  # Format like '( Ivanov )'
 
-def remove_overlapping_ents(
-        ents,
-        proximity_threshold=1
-):
-    # Sort entities by start position and then by end position in reverse
-    ents.sort(key=lambda x: (x[0], -x[1]))
+PREFILTER_NAMES = r'[A-ZА-ЯЁ]|олог'  # capitalized words, or a name in parentheses after 'кардиолога'
+
+GENERAL = compile_guarded(PATTERN_GENERAL, r'[(А-ЯЁ]')
+GENERAL_LATIN = compile_guarded(PATTERN_GENERAL_LATIN, r'[A-Z]', re2_safe=True)
+PARENTHESES = compile_guarded(PATTERN_PARENTHESES, r'\(')
 
-    non_overlapping_ents = []
-    current_start, current_end = None, None
+# Names after a role ('доктор Иванов', 'с сыном Петей', 'наблюдается у Петрова'), searched around the keywords.
+# PATTERN_4 has no keyword (GENERAL_LATIN finds the same names), PATTERN_7 takes any long lower case word
+# after a profession ('хирург проконсультировал') and is not used.
+CONTEXT = KeywordTriggers([
+    TriggeredPattern(PATTERN_1, ('девочк', 'мальчик', 'пациент', 'д-', 'доктор', 'др', 'ревматолог', 'невролог',
+                                 'гинеколог', 'акушер', 'представитель', 'дочер', 'сын', 'муж', 'жен', 'супруг',
+                                 'врач', 'проф', 'пап', 'мам', 'сестр', 'нян', 'невестк', 'отцом', 'сопровождающим')),
+    TriggeredPattern(PATTERN_2, ('олог',), word_start=False),
+    TriggeredPattern(PATTERN_3, ('сыном', 'отцом', 'сопровождающим', 'племянницей', 'дочерьми')),
+    TriggeredPattern(PATTERN_5, ('согласовал', 'наблюда')),
+    TriggeredPattern(PATTERN_6, ('акушер', 'хирург', 'логопед', 'терапевт', 'педиатр', 'кардиолог', 'отоларинголог',
+                                 'гастроэнтеролог', 'психиатр', 'профессор', 'невролог')),
+])
 
-    for ent in ents:
-        start, end, label = ent
 
-        if current_end is None:
-            current_start, current_end = start, end
-        elif start - current_end <= proximity_threshold:
-            # Entities are close enough to be considered part of the same entity
-            current_end = max(current_end, end)
-        else:
-            non_overlapping_ents.append((current_start, current_end, label))
-            current_start, current_end = start, end
+def find_context_names(text, label='PER'):
+    ents = []
+    for m in CONTEXT.finditer(text):
+        group = next(i for i in range(1, len(m.groups()) + 1) if m.start(i) != -1)
+        ents.append((m.start(group), m.end(group), label))
+    return ents
 
-    # Add the last entity
-    if current_end is not None:
-        non_overlapping_ents.append((current_start, current_end, label))
 
-    return non_overlapping_ents
+def remove_overlapping_ents(
+        ents,
+        proximity_threshold=1
+):
+    # Merge overlapping entities and entities close enough to be considered parts of the same name
+    return merge_spans(ents, gap=proximity_threshold)
 
 
 def find_names(
         text,
         specific: bool = True,
         general: bool = True,
-        filter_list=Union[None, List[str]]
+        filter_list: Union[None, List[str]] = None
 ):
     if filter_list is None:
         filter_list = FILTER_LIST
@@ -47,13 +61,13 @@ def find_names(
 
     if general:
         # General Patterns
-        name_entities += [(m.start(0), m.end(0), 'PER') for m in re.finditer(PATTERN_GENERAL, text)]
-        name_entities += [(m.start(0), m.end(0), 'PER') for m in re.finditer(PATTERN_GENERAL_LATIN, text)]
+        name_entities += [(m.start(0), m.end(0), 'PER') for m in GENERAL.finditer(text)]
+        name_entities += [(m.start(0), m.end(0), 'PER') for m in GENERAL_LATIN.finditer(text)]
+
+    name_entities += [(m.start(0), m.end(0), 'PER') for m in PARENTHESES.finditer(text)]
 
-    # Select words that start with a capital letter
-    pattern = r'\(\s*[А-ЯЁ][а-яё]+\s*\)|'  # Format like '( Иванов )'
-    pattern += r'\(\s*[A-Z][a-z]+\s*\)'  # Format like '( Ivanov )'
-    name_entities += [(m.start(0), m.end(0), 'PER') for m in re.finditer(pattern, text)]
+    if specific:
+        name_entities += find_context_names(text)
 
     # Combine and sort the results
     # name_entities = filter_ents_by_pattern(text, name_entities, '[A-Za-z]')
@@ -0,0 +1,270 @@
+import os
+import re
+import time
+import threading
+from typing import Callable, Collection, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from loguru import logger
+
+from .aho_corasick import build_automaton
+
+RULES_REGEX_BACKEND = os.getenv("RULES_REGEX_BACKEND", "re")  # re | re2 (for the patterns marked re2-safe)
+RULES_TIME_BUDGET = float(os.getenv("RULES_TIME_BUDGET", 1.0))  # seconds of rules per text to warn about, 0 - off
+CONTEXT_WINDOW = int(os.getenv("CONTEXT_WINDOW", 64))  # chars around a keyword searched by the context patterns
+
+try:  # linear time regex engine (google-re2), only with RULES_REGEX_BACKEND=re2
+    import re2
+except ImportError:
+    re2 = None
+
+if RULES_REGEX_BACKEND == "re2" and re2 is None:
+    logger.warning("RULES_REGEX_BACKEND=re2, but google-re2 is not installed: using re")
+
+Entity = Tuple[int, int, str]
+
+
+def compile_guarded(pattern: str, first_chars: str, flags: int = 0, re2_safe: bool = False):
+    """
+    Compile `pattern` behind a lookahead on the characters a match can start with (a character class).
+    The matches are the same, but the regex engine rejects most positions of the text with one character
+    test instead of trying every alternative of the pattern there.
+
+    With `re2_safe` the pattern is compiled with re2 when it is the selected backend. re2 treats only ASCII
+    characters as word characters (`\\b`, `\\w`), so mark only the patterns that don't look for Cyrillic words:
+    such a pattern can also match right after a Cyrillic letter ('тел89161234567').
+    """
+    if re2_safe and RULES_REGEX_BACKEND == "re2" and re2 is not None:
+        return re2.compile(("(?i)" if flags & re.IGNORECASE else "") + pattern)
+    return re.compile(f'(?={first_chars})(?:{pattern})', flags)
+
+
+class RunAlternatives:
+    """
+    Alternation of `(pattern, run)` alternatives with the matches of `re.compile('|'.join(patterns))`,
+    found in linear time.
+
+    An alternative with a `run` (a character class) starts with a run of these characters (`[...]*` or
+    `[...]+`) followed by a character outside the class, like the emails `[A-Za-z0-9._%+-]*@...`.
+    The plain alternation tries such an alternative from every character of a run and rescans the run
+    each time: quadratic on a long token without '@'. Here it is tried only at the start of a run
+    (`(?<!run)`, it can't match later in the run if it didn't match earlier) and at the first position
+    of a search, where a failure is remembered by the end of the run: the rest of the match is the same
+    for all positions of the run.
+    """
+
+    def __init__(self, alternatives: List[Tuple[str, Optional[str]]], first_chars: str, flags: int = 0):
+        self.pattern = '|'.join(pattern for pattern, _ in alternatives)
+        self._alternatives = [(re.compile(pattern, flags), re.compile(f'{run}*', flags) if run else None)
+                              for pattern, run in alternatives]
+        anchored = '|'.join(f'(?<!{run}){pattern}' if run else pattern for pattern, run in alternatives)
+        self._anchored = compile_guarded(anchored, first_chars, flags)
+
+    def finditer(self, text: str):
+        runs = [(0, 0)] * len(self._alternatives)  # last run of each alternative
+        failed = [None] * len(self._alternatives)  # end of the run the alternative failed after
+        pos = 0
+        while pos <= len(text):
+            match = self._match_at(text, pos, runs, failed) or self._anchored.search(text, pos + 1)
+            if match is None:
+                return
+            yield match
+            pos = max(match.end(), pos + 1)
+
+    def _match_at(self, text: str, pos: int, runs: list, failed: list):
+        for i, (pattern, run) in enumerate(self._alternatives):
+            if run is not None:
+                start, end = runs[i]
+                if not start <= pos < end:
+                    runs[i] = start, end = pos, run.match(text, pos).end()
+                if failed[i] == end:
+                    continue
+            match = pattern.match(text, pos)
+            if match is not None:
+                return match
+            if run is not None:
+                failed[i] = end
+        return None
+
+
+class TriggeredPattern(NamedTuple):
+    pattern: str  # the entity is the first group taking part in the match
+    keywords: Tuple[str, ...]  # every match contains one of them (lower case, found capitalized and upper case too)
+    word_start: bool = True  # the keywords start a word
+
+
+class KeywordTriggers:
+    """
+    Context patterns ('доктор Иванов', 'с сыном Петей') searched only around their keywords.
+
+    The keywords of all patterns are found in one Aho-Corasick pass over the text, then every pattern is
+    searched in the windows of `window` characters around its keywords (overlapping windows merged), so the
+    cost is one linear pass plus the size of the windows, not one full-text search per pattern.
+    """
+
+    def __init__(self, patterns: List[TriggeredPattern], window: int = CONTEXT_WINDOW, flags: int = 0):
+        self.window = window
+        self._patterns = [re.compile(pattern.pattern, flags) for pattern in patterns]
+        self._triggers = {}  # keyword (any case) -> [(pattern index, word start)]
+        for i, pattern in enumerate(patterns):
+            for keyword in pattern.keywords:
+                for variant in {keyword, keyword.capitalize(), keyword.upper()}:
+                    self._triggers.setdefault(variant, []).append((i, pattern.word_start))
+        self._automaton = build_automaton(self._triggers)
+        self._word_tail = re.compile(rf'\w{{0,{window}}}')  # a window doesn't end inside a word
+
+    def finditer(self, text: str):
+        """Matches of every pattern (one pattern after the other) in the windows around its keywords."""
+        hits = [[] for _ in self._patterns]
+        for last, keyword in self._automaton.iter(text):
+            start = last - len(keyword) + 1
+            for i, word_start in self._triggers[keyword]:
+                if word_start and start > 0 and (text[start - 1].isalnum() or text[start - 1] == '_'):
+                    continue
+                hits[i].append((start, last + 1))
+
+        for pattern, keywords in zip(self._patterns, hits):
+            for lo, hi in self._windows(text, keywords):
+                yield from pattern.finditer(text, lo, hi)
+
+    def _windows(self, text: str, keywords: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+        windows = []
+        for start, end in sorted(keywords):
+            lo = max(start - self.window, 0)
+            hi = self._word_tail.match(text, min(end + self.window, len(text))).end()
+            if windows and lo <= windows[-1][1]:
+                windows[-1] = windows[-1][0], max(windows[-1][1], hi)
+            else:
+                windows.append((lo, hi))
+        return windows
+
+
+class RuleFamily(NamedTuple):
+    name: str
+    label: str
+    find: Callable[..., List[Entity]]
+    options: Tuple[str, ...] = ()  # keyword options of `scan` passed on to `find`
+    requires: Tuple[str, ...] = ()  # labels of the families its entities give way to when they overlap
+    prefilter: Optional[str] = None  # regex found in every text the family finds something in
+
+
+class RuleEngine:
+    """
+    Ordered set of rule families scanned over a text in one call.
+
+    The order of the families follows `spans.LABEL_PRIORITY`: when entities overlap at the same start,
+    the one of the higher priority label is added to the doc (see `add_ents._add_entities`).
+
+    Only the families producing the requested labels are run, with the families they give way to on
+    overlapping spans (`RuleFamily.requires`: without the dates and the contacts, the digits of a date or
+    a phone would be found as SENSITIVE). A family can also be enabled or disabled by name per request.
+    The time spent in every family is collected in `stats()`.
+
+    A family with a `prefilter` (a cheap regex like a character class or a keyword, that every match of
+    the family contains) is skipped on the texts without it. Most of the texts in the DB columns are short
+    and most families find nothing there. Each prefilter is searched at most once per text, the families
+    sharing it (the two SENSITIVE families) reuse the result.
+
+    All patterns run in linear time (`python -m backend.benchmarks.rule_adversarial`). The `time_budget`
+    (seconds per text) can't interrupt a running regex, and skipping the remaining families would leave
+    their entities unmasked, so every family is always run: a text over the budget is only logged with
+    the time of each family and counted in `over_budget`.
+    """
+
+    def __init__(self, families: Iterable[RuleFamily], time_budget: float = RULES_TIME_BUDGET):
+        self.families = list(families)
+        self.time_budget = time_budget
+        self.over_budget = 0
+        self._prefilters = {family.prefilter: re.compile(family.prefilter)
+                            for family in self.families if family.prefilter is not None}
+        self._plans = {}  # (labels, enabled, disabled) -> families
+        self._lock = threading.Lock()
+        self._runs = {family.name: 0 for family in self.families}
+        self._filtered = {family.name: 0 for family in self.families}
+        self._skipped = {family.name: 0 for family in self.families}
+        self._seconds = {family.name: 0.0 for family in self.families}
+
+    @property
+    def labels(self) -> List[str]:
+        return sorted({family.label for family in self.families})
+
+    @property
+    def names(self) -> List[str]:
+        return [family.name for family in self.families]
+
+    def plan(self, labels: Optional[Collection[str]] = None, enabled: Optional[Collection[str]] = None,
+             disabled: Optional[Collection[str]] = None) -> List[RuleFamily]:
+        """
+        Families to run for `labels` (all if None) in the priority order: the families producing them
+        and the ones they require, plus the `enabled` and minus the `disabled` families (by name).
+        """
+        key = (None if labels is None else frozenset(labels), frozenset(enabled or ()), frozenset(disabled or ()))
+        if key not in self._plans:
+            self._plans[key] = self._plan(*key)
+        return self._plans[key]
+
+    def _plan(self, labels: Optional[frozenset], enabled: frozenset, disabled: frozenset) -> List[RuleFamily]:
+        unknown = (enabled | disabled) - set(self.names)
+        if unknown:
+            raise ValueError(f"Unknown rule families: {sorted(unknown)}, available: {self.names}")
+
+        wanted = set(self.labels if labels is None else labels)
+        while True:
+            required = {label for family in self.families if family.label in wanted for label in family.requires}
+            if required <= wanted:
+                break
+            wanted |= required
+        return [family for family in self.families
+                if (family.label in wanted or family.name in enabled) and family.name not in disabled]
+
+    def scan(self, text: str, labels: Optional[Collection[str]] = None, enabled: Optional[Collection[str]] = None,
+             disabled: Optional[Collection[str]] = None, **options) -> Dict[str, List[Entity]]:
+        """Entities found by the families of `plan(labels, enabled, disabled)`, by family name."""
+        found, timings, filtered, prefilters = {}, {}, [], {}
+        for family in self.plan(labels, enabled, disabled):
+            if family.prefilter is not None:
+                if family.prefilter not in prefilters:
+                    prefilters[family.prefilter] = self._prefilters[family.prefilter].search(text) is not None
+                if not prefilters[family.prefilter]:
+                    found[family.name] = []
+                    filtered.append(family.name)
+                    continue
+            kwargs = {option: options[option] for option in family.options if option in options}
+            started = time.perf_counter()
+            found[family.name] = family.find(text, **kwargs)
+            timings[family.name] = time.perf_counter() - started
+
+        with self._lock:
+            for name in self._runs:
+                if name in timings:
+                    self._runs[name] += 1
+                    self._seconds[name] += timings[name]
+                elif name in filtered:
+                    self._filtered[name] += 1
+                else:
+                    self._skipped[name] += 1
+
+        if self.time_budget and sum(timings.values()) > self.time_budget:
+            self.over_budget += 1
+            slowest = sorted(timings.items(), key=lambda item: -item[1])[:3]
+            logger.warning(f"Rules time budget ({self.time_budget}s) exceeded on a text of {len(text)} chars, "
+                           f"slowest: {[(name, round(seconds, 3)) for name, seconds in slowest]}")
+        return found
+
+    def find(self, text: str, labels: Optional[Collection[str]] = None, **options) -> List[Entity]:
+        """Entities of all families in the priority order."""
+        return [ent for ents in self.scan(text, labels, **options).values() for ent in ents]
+
+    def stats(self) -> dict:
+        """
+        Texts scanned by every family, skipped (label not requested) and filtered out by its prefilter,
+        and the time spent in it (in this process).
+        """
+        with self._lock:
+            families = {name: {"runs": self._runs[name],
+                               "skipped": self._skipped[name],
+                               "filtered": self._filtered[name],
+                               "seconds": round(self._seconds[name], 4),
+                               "ms_per_run": round(1000 * self._seconds[name] / self._runs[name], 4)
+                               if self._runs[name] else 0.0}
+                        for name in self._runs}
+        return {"families": families, "over_budget": self.over_budget}
@@ -0,0 +1,49 @@
+from .rule_engine import RuleEngine, RuleFamily
+from .contacts.rules_contacts import (find_contacts_with_pattern, find_phone_with_extension, PREFILTER_CONTACTS,
+                                     PREFILTER_PHONES)
+from .dates.rules_dates import find_dates, PREFILTER_DATES
+from .per.rules_names import find_names, PREFILTER_NAMES
+from .org.rules_org import find_orgs
+from .loc.rules_loc import find_regions, PREFILTER_REGIONS
+from .other.rules_other import find_ids, find_sequences_with_digits, PREFILTER_SENSITIVE
+from .dictionaries import DICTIONARIES
+
+
+def _find_phones(text):
+    return find_phone_with_extension(text, label='CONTACTS')
+
+
+def _find_contacts(text):
+    return find_contacts_with_pattern(text, label='CONTACTS')
+
+
+def _find_names(text, filters=None):
+    return find_names(text, filter_list=filters)
+
+
+def _find_dictionary_locations(text):
+    return DICTIONARIES.find('LOC', text, label='LOC')
+
+
+def _find_ids(text):
+    return find_ids(text, label='SENSITIVE')
+
+
+def _find_digit_sequences(text):
+    return find_sequences_with_digits(text, label='SENSITIVE')
+
+
+# All rules in the priority order
+RULES = RuleEngine([
+    RuleFamily('phone_with_extension', 'CONTACTS', _find_phones, prefilter=PREFILTER_PHONES),  # more specific
+    RuleFamily('contacts', 'CONTACTS', _find_contacts, prefilter=PREFILTER_CONTACTS),
+    RuleFamily('dates', 'DATE', find_dates, prefilter=PREFILTER_DATES),
+    RuleFamily('names', 'PER', _find_names, options=('filters',), prefilter=PREFILTER_NAMES),
+    RuleFamily('orgs', 'ORG', find_orgs),
+    RuleFamily('locations', 'LOC', _find_dictionary_locations),
+    RuleFamily('regions', 'LOC', find_regions, prefilter=PREFILTER_REGIONS),
+    # the digits of phones and dates are found as SENSITIVE too, they are kept only outside of them
+    RuleFamily('ids', 'SENSITIVE', _find_ids, requires=('CONTACTS', 'DATE'), prefilter=PREFILTER_SENSITIVE),
+    RuleFamily('digit_sequences', 'SENSITIVE', _find_digit_sequences, requires=('CONTACTS', 'DATE'),
+               prefilter=PREFILTER_SENSITIVE),
+])
@@ -0,0 +1,50 @@
+from bisect import bisect_right
+from typing import Iterable, List, Sequence, Tuple
+
+# Which entity is kept when overlapping entities start at the same place: names from the client's list
+# (`per_list_label`), then the labels of the rules in the priority order of `RULES`, then the longer entity.
+# Entities of other labels come last. An entity starting earlier is always kept (the doc is read left to right).
+LABEL_PRIORITY = ("PER_LIST", "CONTACTS", "DATE", "PER", "ORG", "LOC", "SENSITIVE")
+
+_RANKS = {label: rank for rank, label in enumerate(LABEL_PRIORITY)}
+
+
+def label_rank(label: str) -> int:
+    return _RANKS.get(label, len(LABEL_PRIORITY))
+
+
+def select_spans(spans: Iterable[tuple], fixed: Sequence[Tuple[int, int]] = ()) -> Tuple[List[tuple], List[tuple]]:
+    """
+    Split `(start, end, label, ...)` spans into the kept and the dropped ones, in one sort and one sweep.
+
+    The spans are taken left to right (by start, then by `LABEL_PRIORITY`, then the longer first). A span is
+    dropped if it overlaps a `fixed` span (sorted, non-overlapping, e.g. the entities of the model) or
+    a span kept before it. The kept spans start after the end of the last kept one, so only that end
+    is compared; the fixed span to compare with is found by bisection.
+    """
+    fixed_ends = [end for _, end in fixed]
+    kept, dropped = [], []
+    kept_end = None
+    for span in sorted(spans, key=lambda span: (span[0], label_rank(span[2]), -span[1])):
+        start, end = span[0], span[1]
+        i = bisect_right(fixed_ends, start)  # the first fixed span ending after the start
+        if (kept_end is not None and start < kept_end) or (i < len(fixed) and fixed[i][0] < end):
+            dropped.append(span)
+            continue
+        kept.append(span)
+        kept_end = end
+    return kept, dropped
+
+
+def merge_spans(spans: Iterable[Tuple[int, int, str]], gap: int = 1) -> List[Tuple[int, int, str]]:
+    """
+    Merge `(start, end, label)` spans overlapping or separated by at most `gap` characters into one span
+    (like 'Иванов' and 'Иван Петрович' in 'Иванов Иван Петрович'), with the label of the first one.
+    """
+    merged = []
+    for start, end, label in sorted(spans, key=lambda span: (span[0], -span[1])):
+        if merged and start - merged[-1][1] <= gap:
+            merged[-1] = (merged[-1][0], max(merged[-1][1], end), merged[-1][2])
+        else:
+            merged.append((start, end, label))
+    return merged
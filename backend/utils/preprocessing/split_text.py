@@ -0,0 +1,83 @@
+import re
+from typing import List, Tuple
+
+# Sentence end: a word of 4+ letters followed by . ! ? or … and a capitalized word / digit.
+# Shorter words are mostly abbreviations and initials ('г.', 'им.', 'И.И.'), they do not end a sentence.
+SENTENCE_BOUNDARY = re.compile(r'(?<=[^\W\d_]{4}[.!?…])[^\S\n]+(?=[A-ZА-ЯЁ0-9«"(])|\s*\n\s*')
+PARAGRAPH_BOUNDARY = re.compile(r'\n\s*\n')
+WHITESPACE = re.compile(r'\s+')
+
+
+def split_sentences(text: str) -> List[Tuple[int, int]]:
+    """
+    Split text into sentences and lines.
+
+    :param text: text to split
+    :return: list of `(start, end)` character offsets of non-empty sentences, without surrounding whitespace
+    """
+    spans = []
+    start = 0
+    for boundary in SENTENCE_BOUNDARY.finditer(text):
+        spans.append((start, boundary.start()))
+        start = boundary.end()
+    spans.append((start, len(text)))
+
+    sentences = []
+    for start, end in spans:
+        while start < end and text[start].isspace():
+            start += 1
+        while end > start and text[end - 1].isspace():
+            end -= 1
+        if start < end:
+            sentences.append((start, end))
+    return sentences
+
+
+def _last_match(pattern: re.Pattern, text: str, start: int, end: int):
+    match = None
+    for match in pattern.finditer(text, start, end):
+        pass
+    return match
+
+
+def _cut(text: str, start: int, end: int) -> int:
+    """Position in `text[start:end]` to end a chunk at: paragraph, then sentence, then word boundary."""
+    for pattern in (PARAGRAPH_BOUNDARY, SENTENCE_BOUNDARY, WHITESPACE):
+        match = _last_match(pattern, text, start, end)
+        if match:
+            return match.end()
+    return end
+
+
+def split_chunks(text: str, max_chars: int, overlap: int = 0) -> List[Tuple[int, int]]:
+    """
+    Split a long text into chunks of at most `max_chars` characters for separate processing.
+
+    Chunks end on a paragraph or sentence boundary when there is one in the second half of the chunk
+    (otherwise on a space), every next chunk starts `overlap` characters before the end of the previous one,
+    so entities cut by a chunk boundary are still seen whole in one of the chunks.
+
+    :param text: text to split
+    :param max_chars: maximum chunk length
+    :param overlap: number of characters shared by neighbouring chunks (at most a quarter of `max_chars`)
+    :return: list of `(start, end)` character offsets of the chunks
+    """
+    overlap = min(overlap, max_chars // 4)
+    chunks = []
+    start = 0
+    while len(text) - start > max_chars:
+        end = _cut(text, start + max_chars // 2, start + max_chars)
+        chunks.append((start, end))
+        # next chunk starts on a word boundary inside the overlap
+        word = WHITESPACE.search(text, end - overlap, end)
+        start = word.end() if word and overlap else end - overlap
+    chunks.append((start, len(text)))
+    return chunks
+
+
+if __name__ == '__main__':
+    text = "Пациент Иванов И.И. осмотрен в г. Москва. Жалоб нет.\nНазначено: МРТ 12.03.2020 в 10:00!  Контроль через неделю"
+    for s, e in split_sentences(text):
+        print(f"| {text[s:e]} |")
+    for s, e in split_chunks(text * 3, max_chars=120, overlap=30):
+        print(f"[{s}:{e}] {(text * 3)[s:e]!r}")